@@ -1,32 +1,119 @@
 from __future__ import annotations
 
-from typing import Dict, Tuple, Optional
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional
 import asyncio
 import json
 import logging
-import time
 
 import networkx as nx
+import numpy as np
 import websockets 
 
+try:
+    # orjson parses in C and is much faster on the per-frame hot path
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 from backend.config import (
     TRAFFIC_CELL_SIZE_DEG,
     AISSTREAM_API_KEY,
 )
-from backend.models import RiskLayer, RiskFeature
+from backend.graph_builder import node_coords, node_risks, attach_node_risks
+from backend.models import RiskLayer, RiskFeature, construct_trusted
 
 logger = logging.getLogger(__name__)
 
 AISSTREAM_URL = "wss://stream.aisstream.io/v0/stream"
 
+POSITION_MESSAGE_TYPES = (
+    "PositionReport",
+    "ExtendedClassBPositionReport",
+    "StandardClassBPositionReport",
+)
+
+# Quoted type names to look for in raw frames before paying for a JSON parse
+_WANTED_STR = tuple(f'"{t}"' for t in POSITION_MESSAGE_TYPES)
+_WANTED_BYTES = tuple(w.encode() for w in _WANTED_STR)
+
+# Upper bound on buffered frames drained per wakeup
+_MAX_DRAIN_BATCH = 256
+
+# With debug logging on, spot-check one in this many positions against the bbox
+_BBOX_CHECK_EVERY = 1000
+
+
+_CELL_LOW_MASK = 0xFFFFFFFF
+
+
+def _cell_key(lat: float, lon: float) -> int:
+    """
+    Snap (lat, lon) to a traffic grid cell of size TRAFFIC_CELL_SIZE_DEG and
+    pack the (row, col) cell indices into a single int (row in the high 32 bits).
+    """
+    cell_i = int(round(lat / TRAFFIC_CELL_SIZE_DEG))
+    cell_j = int(round(lon / TRAFFIC_CELL_SIZE_DEG))
+    return (cell_i << 32) | (cell_j & _CELL_LOW_MASK)
+
+
+def _cell_keys(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Vectorized counterpart of _cell_key over coordinate arrays."""
+    cell_i = np.round(lats / TRAFFIC_CELL_SIZE_DEG).astype(np.int64)
+    cell_j = np.round(lons / TRAFFIC_CELL_SIZE_DEG).astype(np.int64)
+    return (cell_i << 32) | (cell_j & _CELL_LOW_MASK)
+
+
+def _cell_rects(keys: np.ndarray) -> List[List[List[float]]]:
+    """
+    Closed rectangle of [lat, lon] pairs for each packed cell key (the inverse
+    of _cell_key), built in NumPy and converted with a single tolist().
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    cell_lat = (keys >> 32) * TRAFFIC_CELL_SIZE_DEG
+    cell_lon = ((keys << 32) >> 32) * TRAFFIC_CELL_SIZE_DEG  # sign-extend the low 32 bits
+    half = TRAFFIC_CELL_SIZE_DEG / 2.0
+    lat_min, lat_max = cell_lat - half, cell_lat + half
+    lon_min, lon_max = cell_lon - half, cell_lon + half
+    rects = np.stack(
+        [
+            np.stack([lat_min, lon_min], axis=-1),
+            np.stack([lat_min, lon_max], axis=-1),
+            np.stack([lat_max, lon_max], axis=-1),
+            np.stack([lat_max, lon_min], axis=-1),
+            np.stack([lat_min, lon_min], axis=-1),
+        ],
+        axis=1,
+    )
+    return rects.tolist()
+
+
+@lru_cache(maxsize=16)
+def _subscribe_message(api_key: str, bbox: Tuple[float, float, float, float]) -> str:
+    """
+    Serialized AISStream subscription for bbox = (maxLat, minLon, minLat, maxLon).
+    Cached so repeated snapshots over the same area reuse one payload.
+    """
+    lat_max, lon_min, lat_min, lon_max = bbox
+    return json.dumps(
+        {
+            "APIKey": api_key,
+            "BoundingBoxes": [[[lat_max, lon_min], [lat_min, lon_max]]],
+            "FilterMessageTypes": list(POSITION_MESSAGE_TYPES),
+        }
+    )
+
 
-def _cell_for_latlon(lat: float, lon: float) -> Tuple[float, float]:
+def _buffered_frames(websocket) -> int:
     """
-    Snap (lat, lon) to a traffic grid cell of size TRAFFIC_CELL_SIZE_DEG.
+    Number of frames the websocket has already read off the socket but not
+    yet handed out (best effort; 0 if the implementation doesn't expose it).
     """
-    cell_lat = round(lat / TRAFFIC_CELL_SIZE_DEG) * TRAFFIC_CELL_SIZE_DEG
-    cell_lon = round(lon / TRAFFIC_CELL_SIZE_DEG) * TRAFFIC_CELL_SIZE_DEG
-    return cell_lat, cell_lon
+    assembler = getattr(websocket, "recv_messages", None)  # websockets >= 14
+    if assembler is not None:
+        return len(getattr(assembler, "frames", ()))
+    return len(getattr(websocket, "messages", ()))  # legacy implementation
 
 
 def vessel_count_to_risk(count: Optional[int]) -> int:
@@ -41,62 +128,39 @@ def vessel_count_to_risk(count: Optional[int]) -> int:
         return 3
 
 
-async def _collect_traffic_snapshot_async(
-    lat_range: Tuple[float, float],
-    lon_range: Tuple[float, float],
-    duration_sec: float = 60.0,
-) -> Dict[Tuple[float, float], int]:
+async def _stream_positions(
+    bbox: Tuple[float, float, float, float],
+    mmsi_to_cell: Dict[int, int],
+    check_bbox: bool,
+) -> None:
     """
-    Connect to AISStream, collect unique vessels per grid cell within bbox
-    for a limited time window, and return cell -> vessel_count.
+    Subscribe to AISStream for bbox = (maxLat, minLon, minLat, maxLon) and
+    record the latest cell per MMSI into mmsi_to_cell until cancelled.
+    Has no clock of its own: the caller bounds it with asyncio.wait_for, and
+    whatever was collected up to that point stays in mmsi_to_cell.
     """
-    if not AISSTREAM_API_KEY:
-        logger.warning("[traffic] AISSTREAM_API_KEY not set; skipping AIS traffic snapshot.")
-        return {}
-
-    lat_min, lat_max = lat_range
-    lon_min, lon_max = lon_range
-
-    # AISStream expects bbox as [[maxLat, minLon], [minLat, maxLon]]
-    bbox = [[lat_max, lon_min], [lat_min, lon_max]]
-
-    subscribe_message = {
-        "APIKey": AISSTREAM_API_KEY,
-        "BoundingBoxes": [bbox],
-        "FilterMessageTypes": [
-            "PositionReport",
-            "ExtendedClassBPositionReport",
-            "StandardClassBPositionReport",
-        ],
-    }
-
-    logger.info(f"[traffic] Connecting to AISStream for bbox {bbox} ...")
+    lat_max, lon_min, lat_min, lon_max = bbox
+    positions_seen = 0
 
-    # Track latest cell per MMSI to avoid double-counting
-    mmsi_to_cell: Dict[str, Tuple[float, float]] = {}
-    start_time = time.time()
+    async with websockets.connect(AISSTREAM_URL) as websocket:
+        await websocket.send(_subscribe_message(AISSTREAM_API_KEY, bbox))
 
-    try:
-        async with websockets.connect(AISSTREAM_URL) as websocket:
-            await websocket.send(json.dumps(subscribe_message))
+        while True:
+            frames = [await websocket.recv()]
 
-            while True:
-                if time.time() - start_time > duration_sec:
-                    break
+            # Frames often arrive in bursts: drain what is already buffered
+            while len(frames) < _MAX_DRAIN_BATCH and _buffered_frames(websocket):
+                frames.append(await websocket.recv())
 
-                try:
-                    message_json = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                except asyncio.TimeoutError:
-                    # Keep the connection alive while waiting for messages
+            for message_json in frames:
+                # Cheap substring prefilter: drop unwanted frames without parsing
+                wanted = _WANTED_BYTES if isinstance(message_json, bytes) else _WANTED_STR
+                if not any(w in message_json for w in wanted):
                     continue
 
-                message = json.loads(message_json)
+                message = _json_loads(message_json)
                 msg_type = message.get("MessageType")
-                if msg_type not in (
-                    "PositionReport",
-                    "ExtendedClassBPositionReport",
-                    "StandardClassBPositionReport",
-                ):
+                if msg_type not in POSITION_MESSAGE_TYPES:
                     continue
 
                 metadata = message.get("MetaData", {}) or {}
@@ -109,23 +173,72 @@ async def _collect_traffic_snapshot_async(
                 try:
                     lat_f = float(lat)
                     lon_f = float(lon)
+                    mmsi_id = int(mmsi)  # MMSI is a 9-digit number; no str() needed
                 except (TypeError, ValueError):
                     continue
 
-                if not (lat_min <= lat_f <= lat_max and lon_min <= lon_f <= lon_max):
-                    continue
+                if check_bbox:
+                    positions_seen += 1
+                    if positions_seen % _BBOX_CHECK_EVERY == 0 and not (
+                        lat_min <= lat_f <= lat_max and lon_min <= lon_f <= lon_max
+                    ):
+                        logger.debug(
+                            f"[traffic] Position ({lat_f}, {lon_f}) outside subscribed bbox "
+                            f"{[[lat_max, lon_min], [lat_min, lon_max]]}"
+                        )
+
+                mmsi_to_cell[mmsi_id] = _cell_key(lat_f, lon_f)
+
+            # Buffered recv() calls may not suspend; yield so a pending timeout can land
+            await asyncio.sleep(0)
+
+
+async def _collect_traffic_snapshot_async(
+    lat_range: Tuple[float, float],
+    lon_range: Tuple[float, float],
+    duration_sec: float = 60.0,
+) -> Dict[int, int]:
+    """
+    Connect to AISStream, collect unique vessels per grid cell within bbox
+    for a limited time window, and return cell key -> vessel_count.
+    """
+    if not AISSTREAM_API_KEY:
+        logger.warning("[traffic] AISSTREAM_API_KEY not set; skipping AIS traffic snapshot.")
+        return {}
+
+    lat_min, lat_max = lat_range
+    lon_min, lon_max = lon_range
+
+    # AISStream expects bbox as [[maxLat, minLon], [minLat, maxLon]]
+    bbox = [[lat_max, lon_min], [lat_min, lon_max]]
 
-                cell = _cell_for_latlon(lat_f, lon_f)
-                mmsi_to_cell[str(mmsi)] = cell
+    logger.info(f"[traffic] Connecting to AISStream for bbox {bbox} ...")
+
+    # Track latest cell per MMSI to avoid double-counting
+    mmsi_to_cell: Dict[int, int] = {}
 
+    # The BoundingBoxes subscription is enforced server-side; only sanity-check it when debugging
+    check_bbox = __debug__ and logger.isEnabledFor(logging.DEBUG)
+
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    try:
+        # One timer bounds the whole session (connect included) instead of a
+        # clock check per frame; cancellation stops the stream at duration_sec
+        await asyncio.wait_for(
+            _stream_positions((lat_max, lon_min, lat_min, lon_max), mmsi_to_cell, check_bbox),
+            timeout=duration_sec,
+        )
+    except asyncio.TimeoutError:
+        pass
     except Exception as exc:
         logger.warning(f"[traffic] Error while collecting AIS traffic snapshot: {exc}")
         return {}
 
+    logger.debug(f"[traffic] Stream closed after {loop.time() - start_time:.1f}s.")
+
     # Count unique MMSIs per cell
-    cell_counts: Dict[Tuple[float, float], int] = {}
-    for cell in mmsi_to_cell.values():
-        cell_counts[cell] = cell_counts.get(cell, 0) + 1
+    cell_counts: Dict[int, int] = Counter(mmsi_to_cell.values())
 
     logger.info(
         f"[traffic] Snapshot collected: {len(mmsi_to_cell)} unique ships "
@@ -148,22 +261,22 @@ async def update_graph_traffic_from_ais(
 
     if not cell_counts:
         logger.info("[traffic] No traffic data collected; leaving traffic_risk at default (0).")
-        for node_id in G.nodes:
-            if "traffic_risk" not in G.nodes[node_id]:
-                G.nodes[node_id]["traffic_risk"] = 0
+        defaults = {node_id: 0 for node_id, data in G.nodes(data=True) if "traffic_risk" not in data}
+        nx.set_node_attributes(G, defaults, "traffic_risk")
+        attach_node_risks(G)
         return
 
-    updated_nodes = 0
-    for node_id, data in G.nodes(data=True):
-        lat = data.get("lat")
-        lon = data.get("lon")
-        if lat is None or lon is None:
-            continue
-        cell = _cell_for_latlon(float(lat), float(lon))
-        count = cell_counts.get(cell, 0)
-        risk = vessel_count_to_risk(count)
-        G.nodes[node_id]["traffic_risk"] = risk
-        updated_nodes += 1
+    # Snap every node to its cell in NumPy from the graph's coordinate arrays
+    node_ids, coords = node_coords(G)
+    keys = _cell_keys(coords[:, 0], coords[:, 1])
+
+    updates = {
+        node_id: vessel_count_to_risk(cell_counts.get(key, 0))
+        for node_id, key in zip(node_ids, keys.tolist())
+    }
+    nx.set_node_attributes(G, updates, "traffic_risk")
+    attach_node_risks(G)
+    updated_nodes = len(updates)
 
     logger.info(f"[traffic] Updated traffic_risk for {updated_nodes} nodes.")
 
@@ -173,51 +286,31 @@ def build_traffic_layer_from_graph(G: nx.Graph) -> RiskLayer:
     Build a 'traffic' RiskLayer from node-level traffic_risk.
     One rectangle polygon per grid cell with risk > 0 (max risk per cell).
     """
-    # 1) Aggregate max risk per cell
-    cell_risks: Dict[Tuple[float, float], int] = {}
-    for _, data in G.nodes(data=True):
-        lat = data.get("lat")
-        lon = data.get("lon")
-        if lat is None or lon is None:
-            continue
-        cell = _cell_for_latlon(float(lat), float(lon))
-        risk = int(data.get("traffic_risk", 0))
-        if risk <= 0:
-            continue
-        prev = cell_risks.get(cell, 0)
-        if risk > prev:
-            cell_risks[cell] = risk
-
-    # 2) Emit rectangular polygons per cell (lat/lon order for frontend)
-    features: list[RiskFeature] = []
-    half = TRAFFIC_CELL_SIZE_DEG / 2.0
-    idx = 0
-
-    for (cell_lat, cell_lon), risk in cell_risks.items():
-        lat_min = cell_lat - half
-        lat_max = cell_lat + half
-        lon_min = cell_lon - half
-        lon_max = cell_lon + half
-
-        polygon = [
-            [lat_min, lon_min],
-            [lat_min, lon_max],
-            [lat_max, lon_max],
-            [lat_max, lon_min],
-            [lat_min, lon_min],
-        ]
-
-        features.append(
-            RiskFeature(
-                id=f"traffic_{idx}",
-                polygon=polygon,
-                riskLevel=risk,
-                severity=None,
-            )
+    # 1) Aggregate max risk per cell (vectorized over all nodes)
+    _node_ids, coords = node_coords(G)
+    _node_index, risks = node_risks(G)
+    risk_arr = risks["traffic_risk"].astype(np.int32)  # truncates like int(), levels are 0..3
+    mask = risk_arr > 0
+    keys = _cell_keys(coords[mask, 0], coords[mask, 1])
+
+    cell_keys, inverse = np.unique(keys, return_inverse=True)
+    cell_max = np.zeros(len(cell_keys), dtype=np.int32)
+    np.maximum.at(cell_max, inverse.ravel(), risk_arr[mask])
+
+    # 2) Emit one rectangle per cell straight from the aggregated arrays
+    features: List[RiskFeature] = [
+        construct_trusted(
+            RiskFeature,
+            id=f"traffic_{idx}",
+            polygon=polygon,
+            riskLevel=risk,
+            severity=None,
         )
-        idx += 1
+        for idx, (polygon, risk) in enumerate(zip(_cell_rects(cell_keys), cell_max.tolist()))
+    ]
 
-    return RiskLayer(
+    return construct_trusted(
+        RiskLayer,
         type="traffic",
         name="Live vessel traffic density",
         features=features,
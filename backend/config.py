@@ -1,22 +1,33 @@
 from pathlib import Path
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 # Base paths
 BASE_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = BASE_DIR.parent
 DATA_DIR = PROJECT_ROOT / "data"
 
+# Optional .env at the project root; variables set by the process manager
+# work without it, so skip python-dotenv (and its directory walk) otherwise
+ENV_FILE_PATH = PROJECT_ROOT / ".env"
+if ENV_FILE_PATH.exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_FILE_PATH)
+
 # Data files
 WPI_CSV_PATH = DATA_DIR / "world_port_index_sample.csv"
 PIRACY_GEOJSON_PATH = DATA_DIR / "piracy_zones.geojson"
 WEATHER_GEOJSON_PATH = DATA_DIR / "weather_zones.geojson"
 GEBCO_NETCDF_PATH = DATA_DIR / "gebco_bathymetry.nc"
 
-# Graph cache
+# Graph cache (save_graph writes the .npz; the pickle is the legacy format, still loadable)
+GRAPH_NPZ_PATH = DATA_DIR / "maritime_graph.npz"
 GRAPH_PICKLE_PATH = DATA_DIR / "maritime_graph.pkl"
+# Routing arrays saved next to it as plain .npy files, memory-mapped on load
+GRAPH_ARRAYS_DIR = DATA_DIR / "maritime_graph_arrays"
+
+# Mean Earth radius (6371.0088 km) in nautical miles, for great-circle distances
+EARTH_RADIUS_NM = 6371.0088 * 0.539957
 
 # Grid resolution (degrees)
 GRID_LAT_STEP = 0.1
@@ -27,11 +38,20 @@ LAMBDA_PIRACY = 10.0
 LAMBDA_WEATHER = 3.0
 LAMBDA_DEPTH = 10.0
 
+# Shortest paths memoized per (endpoint nodes, mode, vessel flag, risk version)
+ROUTE_CACHE_SIZE = 4096
+
+# Full /route responses memoized on top of that (each holds every segment of its path)
+ROUTE_RESPONSE_CACHE_SIZE = 256
+
+# Threads running /route searches off the event loop (per server process)
+ROUTE_WORKERS = 4
+
 # Bathymetry threshold (meters)
 MIN_DEPTH_METERS = 50
 
 # Continuous weather penalty (used by live weather)
-WAVE_HEIGHT_THRESHOLDS_M = (1.0, 2.5)
+WAVE_HEIGHT_THRESHOLDS_M = (1.5, 3.0)
 WIND_SPEED_THRESHOLD_MS = 8.0
 WEATHER_WAVE_WEIGHT = 6.0
 WEATHER_WIND_WEIGHT = 3.0
@@ -39,7 +59,8 @@ WEATHER_WIND_WEIGHT = 3.0
 # Live weather API / tiling
 WEATHER_API_BASE_URL = "https://marine-api.open-meteo.com/v1/marine"
 WEATHER_CELL_SIZE_DEG = 2.0
-WAVE_HEIGHT_THRESHOLDS_M = (1.5, 3.0)  # NOTE: redefined; this overrides the earlier tuple
+# On-disk cache of fetched cells, keyed by (cell_lat, cell_lon, UTC hour)
+WEATHER_CACHE_PATH = DATA_DIR / "weather_cache.sqlite"
 
 # Radius to buffer point incidents into polygons (nautical miles)
 INCIDENT_RADIUS_NM = 50.0
@@ -57,5 +78,7 @@ AIS_LON_RANGE = (30.0, 65.0)
 
 # Geopolitics
 GEOPOLITICS_GEOJSON_PATH = DATA_DIR / "geopolitics_config.geojson"
+# How often the server checks the GeoJSON for edits (seconds)
+GEOPOLITICS_RELOAD_SEC = 60.0
 # Base geopolitical risk weight (routing still adjusts per mode)
 LAMBDA_GEO = 5.0
@@ -1,10 +1,13 @@
 # data_sources.py
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Tuple
+import math
 
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
 import xarray as xr
 
 from backend.config import (
@@ -15,68 +18,101 @@ from backend.config import (
     MIN_DEPTH_METERS,
     INCIDENT_RADIUS_NM,
 )
-from backend.models import Port, RiskLayer, RiskFeature
+from backend.models import Port, RiskLayer, RiskFeature, construct_trusted
 
 
 def load_ports_from_wpi() -> Dict[str, Port]:
     """Read WPI CSV and return a dict of ports keyed by port_id."""
     df = pd.read_csv(WPI_CSV_PATH)
     ports: Dict[str, Port] = {}
-    for _, row in df.iterrows():
+    columns = ["port_id", "port_name", "country", "latitude", "longitude"]
+    for port_id, name, country, lat, lon in df[columns].itertuples(index=False, name=None):
         port = Port(
-            id=str(row["port_id"]),
-            name=row["port_name"],
-            country=row["country"],
-            latitude=float(row["latitude"]),
-            longitude=float(row["longitude"]),
+            id=str(port_id),
+            name=name,
+            country=country,
+            latitude=float(lat),
+            longitude=float(lon),
         )
         ports[port.id] = port
     return ports
 
 
+def _first_column(df: pd.DataFrame, names, default) -> list:
+    """Values of the first column in `names` present in df, else `default` per row."""
+    for name in names:
+        if name in df.columns:
+            return df[name].tolist()
+    return [default] * len(df)
+
+
+def _exterior_latlon(poly) -> List[List[float]]:
+    """Exterior ring of a shapely polygon as [lat, lon] pairs (shapely coords are lon, lat)."""
+    return np.asarray(poly.exterior.coords)[:, 1::-1].tolist()
+
+
+def _polygon_parts(geom) -> list:
+    """Polygon parts of a (Multi)Polygon geometry; empty for anything else."""
+    if geom.geom_type == "Polygon":
+        return [geom]
+    if geom.geom_type == "MultiPolygon":
+        return list(geom.geoms)
+    return []
+
+
+# Vertices used to approximate an incident circle (plenty for display and containment)
+INCIDENT_CIRCLE_POINTS = 16
+
+
+def _circle_latlon(lat: float, lon: float, radius_nm: float, n: int = INCIDENT_CIRCLE_POINTS) -> List[List[float]]:
+    """
+    Closed n-gon approximating a circle of radius_nm around (lat, lon), as [lat, lon] pairs.
+    1° lat ≈ 60 nm; the longitude radius is widened by 1/cos(lat) to stay round on the ground.
+    """
+    deg_lat = radius_nm / 60.0
+    deg_lon = deg_lat / max(math.cos(math.radians(lat)), 1e-6)
+    t = np.linspace(0.0, 2.0 * np.pi, n + 1)
+    ring = np.column_stack([lat + deg_lat * np.sin(t), lon + deg_lon * np.cos(t)]).tolist()
+    ring[-1] = ring[0]
+    return ring
+
+
 def load_piracy_zones() -> RiskLayer:
     """
     Build a piracy RiskLayer.
     - Polygons and MultiPolygons are used as-is.
-    - Points are buffered into circles (approx; 1° lat ≈ 60 nm) with INCIDENT_RADIUS_NM.
+    - Points become circles of INCIDENT_RADIUS_NM (see _circle_latlon).
     - Output polygons use [lat, lon] ordering for the frontend.
     """
     gdf = gpd.read_file(PIRACY_GEOJSON_PATH)
-    features: List[RiskFeature] = []
 
-    for _, row in gdf.iterrows():
-        geom = row.geometry
+    zone_ids = _first_column(gdf, ("id", "name"), "piracy_zone")
+    risk_levels = _first_column(gdf, ("risk_level",), 3)
+
+    # (zone_id, [lat, lon] ring, risk_level) for every polygon part / incident circle
+    rings = []
+    for geom, zone_id, risk_level in zip(gdf.geometry, zone_ids, risk_levels):
         if geom is None:
             continue
-
-        risk_level = int(row.get("risk_level", 3))
-        polygons = []
-
-        if geom.geom_type == "Polygon":
-            polygons = [geom]
-        elif geom.geom_type == "MultiPolygon":
-            polygons = list(geom.geoms)
-        elif geom.geom_type == "Point":
-            # Quick approximation: 1° latitude ~ 60 nm → buffer in degrees
-            radius_deg = INCIDENT_RADIUS_NM / 60.0
-            buffered = geom.buffer(radius_deg)
-            polygons = [buffered]
+        if geom.geom_type == "Point":
+            # Analytic circle, already in [lat, lon]; no shapely buffer round-trip
+            rings.append((zone_id, _circle_latlon(float(geom.y), float(geom.x), INCIDENT_RADIUS_NM), risk_level))
         else:
-            continue
+            rings.extend((zone_id, _exterior_latlon(poly), risk_level) for poly in _polygon_parts(geom))
+
+    features: List[RiskFeature] = [
+        construct_trusted(
+            RiskFeature,
+            id=str(zone_id),
+            polygon=coords,
+            riskLevel=int(risk_level),
+            severity=None,
+        )
+        for zone_id, coords, risk_level in rings
+    ]
 
-        for poly in polygons:
-            # shapely exterior coords are (lon, lat); convert to [lat, lon]
-            coords = [[float(y), float(x)] for x, y in poly.exterior.coords]
-            features.append(
-                RiskFeature(
-                    id=str(row.get("id", row.get("name", "piracy_zone"))),
-                    polygon=coords,
-                    riskLevel=risk_level,
-                    severity=None,
-                )
-            )
-
-    return RiskLayer(
+    return construct_trusted(
+        RiskLayer,
         type="piracy",
         name="Piracy High Risk Areas (bbox + incidents)",
         features=features,
@@ -89,50 +125,215 @@ def load_weather_zones() -> RiskLayer:
     Output polygons use [lat, lon]; severity defaults to 2.
     """
     gdf = gpd.read_file(WEATHER_GEOJSON_PATH)
-    features: List[RiskFeature] = []
 
-    for _, row in gdf.iterrows():
-        geom = row.geometry
-        if geom is None:
-            continue
+    zone_ids = _first_column(gdf, ("id", "name"), "weather_zone")
+    severities = _first_column(gdf, ("severity",), 2)
 
-        if geom.geom_type == "Polygon":
-            polygons = [geom]
-        elif geom.geom_type == "MultiPolygon":
-            polygons = list(geom.geoms)
-        else:
-            continue
+    features: List[RiskFeature] = [
+        construct_trusted(
+            RiskFeature,
+            id=str(zone_id),
+            polygon=_exterior_latlon(poly),
+            riskLevel=None,
+            severity=int(severity),
+        )
+        for geom, zone_id, severity in zip(gdf.geometry, zone_ids, severities)
+        if geom is not None
+        for poly in _polygon_parts(geom)
+    ]
 
-        for poly in polygons:
-            coords = [[float(y), float(x)] for x, y in poly.exterior.coords]
-            features.append(
-                RiskFeature(
-                    id=str(row.get("id", row.get("name", "weather_zone"))),
-                    polygon=coords,
-                    riskLevel=None,
-                    severity=int(row.get("severity", 2)),
-                )
-            )
-
-    return RiskLayer(
+    return construct_trusted(
+        RiskLayer,
         type="weather",
         name="Weather Risk Areas (NOAA/ECMWF-derived)",
         features=features,
     )
 
 
-def load_bathymetry() -> xr.Dataset:
-    """Open GEBCO NetCDF once; caller can reuse the Dataset."""
-    ds = xr.open_dataset(GEBCO_NETCDF_PATH)
-    return ds
+# Quadtree cells holding at most this many points get the exact per-point test
+_QUADTREE_LEAF_POINTS = 64
+_QUADTREE_MAX_DEPTH = 16
+
+
+def _quadtree_contained(poly, lats, lons, idx, bounds, depth, out) -> None:
+    """
+    Append to `out` the entries of idx whose point lies inside poly, by
+    classifying the cell `bounds` = (min_lon, min_lat, max_lon, max_lat):
+      - strictly inside poly: every point in the cell is, no per-point test
+      - disjoint from poly: none is
+      - straddling the boundary: split into 4 quadrants, down to small leaves
+        where the points are tested exactly with contains_xy
+    """
+    min_lon, min_lat, max_lon, max_lat = bounds
+    cell = shapely.box(min_lon, min_lat, max_lon, max_lat)
+    if shapely.contains_properly(poly, cell):
+        out.append(idx)
+        return
+    if not shapely.intersects(poly, cell):
+        return
+    if depth == 0 or len(idx) <= _QUADTREE_LEAF_POINTS:
+        # Exact test in GEOS, not a hand-rolled ray cast: grid points often sit on
+        # zone edges, and those must stay outside exactly as with poly.contains
+        out.append(idx[shapely.contains_xy(poly, lons[idx], lats[idx])])
+        return
+
+    mid_lon = (min_lon + max_lon) / 2.0
+    mid_lat = (min_lat + max_lat) / 2.0
+    east = lons[idx] > mid_lon
+    north = lats[idx] > mid_lat
+    for quadrant, quadrant_bounds in (
+        (~east & ~north, (min_lon, min_lat, mid_lon, mid_lat)),
+        (east & ~north, (mid_lon, min_lat, max_lon, mid_lat)),
+        (~east & north, (min_lon, mid_lat, mid_lon, max_lat)),
+        (east & north, (mid_lon, mid_lat, max_lon, max_lat)),
+    ):
+        sub = idx[quadrant]
+        if len(sub):
+            _quadtree_contained(poly, lats, lons, sub, quadrant_bounds, depth - 1, out)
+
+
+def points_in_polygons(polygons, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (point_idx, polygon_idx) pairs for every point inside one of `polygons`
+    (same predicate as poly.contains(Point(lon, lat))), sorted by point then polygon.
+    Each polygon only looks at the points in its bounding box (a searchsorted
+    window over longitude-sorted points) and classifies them with an adaptive
+    quadtree (see _quadtree_contained): cells wholly inside or outside the
+    polygon are settled with one test, only boundary cells test their points.
+    """
+    polygons = list(polygons)
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+
+    by_lon = np.argsort(lons, kind="stable")
+    sorted_lons = lons[by_lon]
+
+    point_parts: List[np.ndarray] = []
+    poly_parts: List[np.ndarray] = []
+    for k, poly in enumerate(polygons):
+        min_lon, min_lat, max_lon, max_lat = poly.bounds
+        lo = np.searchsorted(sorted_lons, min_lon, side="left")
+        hi = np.searchsorted(sorted_lons, max_lon, side="right")
+        candidates = by_lon[lo:hi]
+        cand_lats = lats[candidates]
+        candidates = candidates[(cand_lats >= min_lat) & (cand_lats <= max_lat)]
+        if not len(candidates):
+            continue
+
+        hits: List[np.ndarray] = []
+        cell = (lons[candidates].min(), lats[candidates].min(), lons[candidates].max(), lats[candidates].max())
+        _quadtree_contained(poly, lats, lons, candidates, cell, _QUADTREE_MAX_DEPTH, hits)
+        if hits:
+            inside = np.concatenate(hits)
+            point_parts.append(inside)
+            poly_parts.append(np.full(len(inside), k, dtype=np.intp))
+
+    if not point_parts:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    point_idx = np.concatenate(point_parts).astype(np.intp, copy=False)
+    poly_idx = np.concatenate(poly_parts)
+    order = np.lexsort((poly_idx, point_idx))
+    return point_idx[order], poly_idx[order]
+
+
+def polygons_in_bbox(items, bbox: Tuple[float, float, float, float]) -> list:
+    """
+    The entries of `items` (tuples whose first element is a shapely geometry)
+    whose bounding box intersects bbox = (min_lon, min_lat, max_lon, max_lat).
+    Zones that cannot contain any point of a regional grid are dropped up front.
+    """
+    items = list(items)
+    if not items:
+        return items
+    bounds = shapely.bounds(np.asarray([item[0] for item in items], dtype=object))
+    min_lon, min_lat, max_lon, max_lat = bbox
+    keep = (
+        (bounds[:, 0] <= max_lon) & (bounds[:, 2] >= min_lon)
+        & (bounds[:, 1] <= max_lat) & (bounds[:, 3] >= min_lat)
+    )
+    return [item for item, k in zip(items, keep.tolist()) if k]
+
+
+class Bathymetry(NamedTuple):
+    """
+    GEBCO elevation preloaded as a dense array on its regular lat/lon grid.
+    elevation[i, j] is at (lat0 + i * dlat, lon0 + j * dlon); meters,
+    negative = ocean depth.
+    """
+
+    elevation: np.ndarray
+    lat0: float
+    dlat: float
+    lon0: float
+    dlon: float
+
+
+def load_bathymetry() -> Bathymetry:
+    """Read GEBCO NetCDF once into memory; caller can reuse the result."""
+    with xr.open_dataset(GEBCO_NETCDF_PATH) as ds:
+        elevation = ds["elevation"].transpose("lat", "lon").values
+        lat_axis = ds["lat"].values.astype(np.float64)
+        lon_axis = ds["lon"].values.astype(np.float64)
+
+    # Elevations are whole meters within int16 range; float grids (or int16 ones
+    # decoded to float because of a _FillValue) are narrowed to 2 bytes per cell.
+    # Missing cells become 0 m, which the lookups below already treated NaN as.
+    if elevation.dtype != np.int16:
+        elevation = np.clip(np.rint(np.nan_to_num(elevation, nan=0.0)), -32768, 32767).astype(np.int16)
+
+    # GEBCO grids are regular: nearest-cell lookup becomes index arithmetic
+    return Bathymetry(
+        elevation=elevation,
+        lat0=float(lat_axis[0]),
+        dlat=float((lat_axis[-1] - lat_axis[0]) / max(len(lat_axis) - 1, 1)),
+        lon0=float(lon_axis[0]),
+        dlon=float((lon_axis[-1] - lon_axis[0]) / max(len(lon_axis) - 1, 1)),
+    )
+
+
+def _elevation_at(bathy: Bathymetry, lat: float, lon: float):
+    """Raw elevation of the grid cell nearest to (lat, lon)."""
+    n_lat, n_lon = bathy.elevation.shape
+    i = min(max(int(round((lat - bathy.lat0) / bathy.dlat)), 0), n_lat - 1)
+    j = min(max(int(round((lon - bathy.lon0) / bathy.dlon)), 0), n_lon - 1)
+    return bathy.elevation[i, j]
+
+
+def _elevations_batch(bathy: Bathymetry, lats, lons) -> np.ndarray:
+    """Raw elevation (nearest cell) for every (lat, lon) pair via one fancy index."""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    n_lat, n_lon = bathy.elevation.shape
+    i = np.clip(np.round((lats - bathy.lat0) / bathy.dlat).astype(np.intp), 0, n_lat - 1)
+    j = np.clip(np.round((lons - bathy.lon0) / bathy.dlon).astype(np.intp), 0, n_lon - 1)
+    return bathy.elevation[i, j]
+
+
+def get_depths_batch(bathy: Bathymetry, lats, lons) -> np.ndarray:
+    """
+    Vectorized get_depth_at: water depth in meters for arrays of points
+    (0.0 on land), same shape as lats/lons.
+    """
+    vals = _elevations_batch(bathy, lats, lons)
+    return np.where(vals < 0, -vals.astype(np.float64), 0.0)
+
+
+def is_shallow_batch(bathy: Bathymetry, lats, lons, min_depth: float = MIN_DEPTH_METERS) -> np.ndarray:
+    """Vectorized is_shallow: boolean array, True where depth < min_depth."""
+    return get_depths_batch(bathy, lats, lons) < min_depth
+
+
+def is_land_batch(bathy: Bathymetry, lats, lons) -> np.ndarray:
+    """Vectorized is_land: boolean array, True where elevation >= ~5 m."""
+    return _elevations_batch(bathy, lats, lons) >= 5
 
 
-def get_depth_at(ds: xr.Dataset, lat: float, lon: float) -> float:
+def get_depth_at(bathy: Bathymetry, lat: float, lon: float) -> float:
     """
     Return water depth in meters at (lat, lon).
     GEBCO elevation: negative = ocean depth; positive/zero = land.
     """
-    depth_value = ds["elevation"].sel(lat=lat, lon=lon, method="nearest").values.item()
+    depth_value = _elevation_at(bathy, lat, lon)
     if depth_value < 0:
         depth_m = -float(depth_value)
     else:
@@ -140,16 +341,15 @@ def get_depth_at(ds: xr.Dataset, lat: float, lon: float) -> float:
     return depth_m
 
 
-def is_shallow(ds: xr.Dataset, lat: float, lon: float, min_depth: float = MIN_DEPTH_METERS) -> bool:
+def is_shallow(bathy: Bathymetry, lat: float, lon: float, min_depth: float = MIN_DEPTH_METERS) -> bool:
     """True if depth is below the minimum safe draft threshold."""
-    depth = get_depth_at(ds, lat, lon)
+    depth = get_depth_at(bathy, lat, lon)
     return depth < min_depth
 
 
-def is_land(ds: xr.Dataset, lat: float, lon: float) -> bool:
+def is_land(bathy: Bathymetry, lat: float, lon: float) -> bool:
     """
     True if the cell corresponds to land (elevation >= ~5 m).
     Note: using a small positive threshold to avoid coastline noise.
     """
-    depth_value = ds["elevation"].sel(lat=lat, lon=lon, method="nearest").values.item()
-    return float(depth_value) >= 5.0
+    return bool(_elevation_at(bathy, lat, lon) >= 5)
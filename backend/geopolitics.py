@@ -1,28 +1,57 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-from shapely.geometry import shape, Point
+import numpy as np
+import shapely
+from shapely.geometry import shape
+
+try:
+    # orjson parses in C, straight from bytes
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 from backend.config import GEOPOLITICS_GEOJSON_PATH
+from backend.data_sources import points_in_polygons, polygons_in_bbox
 from backend.models import RiskLayer, RiskFeature
 
 
-def load_geopolitics_config():
+class GeopoliticsConfig(NamedTuple):
+    layer: RiskLayer
+    # (shapely_polygon, base_risk, target_flags_dict, zone_id, name, notes)
+    polygons: Tuple[Tuple[object, float, Dict[str, float], str, str, str], ...]
+    country_aliases: Dict[str, str]
+    # zone_id -> {"name", "notes"} for every feature with an id, geometry or not
+    zone_metadata: Dict[str, Dict[str, str]]
+
+
+# mtime of the GeoJSON behind the cached config (None = nothing cached yet)
+_loaded_mtime: Optional[float] = None
+
+
+@lru_cache(maxsize=1)
+def load_geopolitics_config() -> GeopoliticsConfig:
     """
-    Load geopolitics GeoJSON and return:
-      - RiskLayer (for /risk-layers frontend)
-      - list of (shapely_polygon, base_risk, target_flags_dict, zone_id, name, notes)
-      - country_aliases (country name -> ISO3)
+    Load geopolitics GeoJSON once and return a GeopoliticsConfig:
+      - layer: RiskLayer (for /risk-layers frontend)
+      - polygons: (shapely_polygon, base_risk, target_flags_dict, zone_id, name, notes)
+      - country_aliases: country name -> ISO3
+      - zone_metadata: zone_id -> {"name", "notes"} (see get_zone_metadata)
+    The result is cached and shared; callers must not mutate it.
+    See invalidate_geopolitics_config() to pick up edits to the file.
     """
+    global _loaded_mtime
+
     path = GEOPOLITICS_GEOJSON_PATH
     if not path.exists():
         raise FileNotFoundError(f"Geopolitics config not found at {path}")
+    _loaded_mtime = path.stat().st_mtime
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = _json_loads(path.read_bytes())
 
     props = data.get("properties", {}) or {}
     country_aliases: Dict[str, str] = props.get("country_aliases", {}) or {}
@@ -30,9 +59,19 @@ def load_geopolitics_config():
     features: List[RiskFeature] = []
     # Note: polygon element is a Shapely geometry (Polygon/MultiPolygon).
     polygons: List[Tuple[object, float, Dict[str, float], str, str, str]] = []
+    zone_metadata: Dict[str, Dict[str, str]] = {}
 
     for feat in data.get("features", []):
         fprops = feat.get("properties", {}) or {}
+
+        # Alert metadata comes from the raw features: only zones with an explicit id
+        meta_id = fprops.get("zone_id") or fprops.get("id")
+        if meta_id:
+            zone_metadata[str(meta_id)] = {
+                "name": fprops.get("name", str(meta_id)),
+                "notes": fprops.get("notes", ""),
+            }
+
         geom = feat.get("geometry")
         if not geom:
             continue
@@ -44,6 +83,7 @@ def load_geopolitics_config():
         notes = fprops.get("notes", "")
 
         poly = shape(geom)
+        shapely.prepare(poly)  # edge index built once; the config is cached and reused
         polygons.append(
             (poly, base_risk, {k: float(v) for k, v in target_flags.items()}, str(zone_id), name, notes)
         )
@@ -67,7 +107,142 @@ def load_geopolitics_config():
         features=features,
     )
 
-    return risk_layer, polygons, country_aliases
+    return GeopoliticsConfig(risk_layer, tuple(polygons), country_aliases, zone_metadata)
+
+
+def invalidate_geopolitics_config() -> bool:
+    """
+    Drop the cached config if the GeoJSON changed (or vanished) since it was
+    loaded; the next load_geopolitics_config() call re-reads it. Returns True
+    if the cache was cleared.
+    """
+    if _loaded_mtime is None:
+        return False
+    path = GEOPOLITICS_GEOJSON_PATH
+    mtime = path.stat().st_mtime if path.exists() else None
+    if mtime == _loaded_mtime:
+        return False
+    load_geopolitics_config.cache_clear()
+    _zone_metadata.cache_clear()
+    return True
+
+
+def iso3_codes(polygons) -> List[str]:
+    """Sorted union of the ISO3 codes targeted by any zone (target-flag matrix columns)."""
+    return sorted({iso for _, _, target_flags, *_ in polygons for iso in target_flags})
+
+
+def _distinct_rows(membership: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    np.unique(membership, axis=0, return_inverse=True) for a boolean matrix.
+    With up to 64 columns each row is packed into one uint64, so the sort runs
+    on plain integers instead of row-wise comparisons.
+    """
+    n_cols = membership.shape[1]
+    if n_cols == 0 or n_cols > 64:
+        distinct, inverse = np.unique(membership, axis=0, return_inverse=True)
+        return distinct, inverse.ravel()
+    packed = np.packbits(membership, axis=1, bitorder="little")
+    packed = np.pad(packed, ((0, 0), (0, 8 - packed.shape[1])))
+    keys = packed.view("<u8").ravel()
+    distinct_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return membership[first], inverse.ravel()
+
+
+def geopolitics_at(
+    polygons, lats, lons
+) -> Tuple[np.ndarray, List[Dict[str, float]], List[List[str]], np.ndarray]:
+    """
+    Geopolitics for arrays of points (see points_in_polygons):
+      - base risk per point (max over containing zones, 0.0 if none)
+      - target flags per point (max extra per ISO3)
+      - zone ids per point (in config order, no repeats)
+      - the same target flags as a float16 (points, ISO3) matrix, columns
+        in iso3_codes(polygons) order
+    """
+    n = len(lats)
+    codes = iso3_codes(polygons)
+    iso3_index = {iso: j for j, iso in enumerate(codes)}
+
+    point_idx, poly_idx = points_in_polygons([poly for poly, *_ in polygons], lats, lons)
+
+    # Points inside the same set of zones get the same answer, and a handful of
+    # sets covers every node: resolve each distinct set once, then gather.
+    membership = np.zeros((n, len(polygons)), dtype=bool)
+    membership[point_idx, poly_idx] = True
+    hit_points = np.unique(point_idx)
+    zone_sets, set_of_point = _distinct_rows(membership[hit_points])
+
+    set_base = np.zeros(len(zone_sets), dtype=np.float64)
+    set_matrix = np.zeros((len(zone_sets), len(codes)), dtype=np.float64)
+    set_flags: List[Dict[str, float]] = []
+    set_zones: List[List[str]] = []
+    for s, zone_set in enumerate(zone_sets):
+        point_flags: Dict[str, float] = {}
+        point_zones: List[str] = []
+        for k in np.flatnonzero(zone_set).tolist():
+            _, base_risk, target_flags, zone_id, _, _ = polygons[k]
+            set_base[s] = max(set_base[s], base_risk)
+            for iso, val in target_flags.items():
+                if val > point_flags.get(iso, 0.0):
+                    point_flags[iso] = val
+            if zone_id not in point_zones:
+                point_zones.append(zone_id)
+        for iso, val in point_flags.items():
+            set_matrix[s, iso3_index[iso]] = val
+        set_flags.append(point_flags)
+        set_zones.append(point_zones)
+
+    base_max = np.zeros(n, dtype=np.float64)
+    base_max[hit_points] = set_base[set_of_point]
+    flags_matrix = np.zeros((n, len(codes)), dtype=np.float16)
+    flags_matrix[hit_points] = set_matrix[set_of_point]
+
+    # Fresh containers per point: callers store them as node attributes
+    flags: List[Dict[str, float]] = [{} for _ in range(n)]
+    zones: List[List[str]] = [[] for _ in range(n)]
+    for i, s in zip(hit_points.tolist(), set_of_point.tolist()):
+        flags[i] = set_flags[s].copy()
+        zones[i] = set_zones[s].copy()
+
+    return base_max, flags, zones, flags_matrix
+
+
+def attach_target_flags(G, codes: List[str], flags_matrix: np.ndarray) -> None:
+    """
+    Store the per-node target flags as arrays:
+      - G.graph["geo_iso3"]: ISO3 codes (matrix columns)
+      - G.graph["iso3_index"]: ISO3 -> column
+      - G.graph["geo_flags_matrix"]: float16 (N, n_iso3) extras, rows in node_coords order
+    """
+    G.graph["geo_iso3"] = np.asarray(codes, dtype=str)
+    G.graph["iso3_index"] = {iso: j for j, iso in enumerate(codes)}
+    G.graph["geo_flags_matrix"] = flags_matrix
+
+
+def target_flags_matrix(G) -> Tuple[Dict[str, int], np.ndarray]:
+    """
+    Return (iso3_index, geo_flags_matrix) for G, restoring the index from
+    G.graph["geo_iso3"] after a reload, or deriving both from the per-node
+    geo_target_flags dicts when missing (e.g. pickled graphs) or stale.
+    """
+    from backend.graph_builder import node_coords
+
+    node_ids, _coords = node_coords(G)
+    matrix = G.graph.get("geo_flags_matrix")
+    if matrix is None or len(matrix) != len(node_ids):
+        nodes = G.nodes
+        node_flags = [nodes[node_id].get("geo_target_flags") or {} for node_id in node_ids]
+        codes = sorted({iso for flags in node_flags for iso in flags})
+        column = {iso: j for j, iso in enumerate(codes)}
+        matrix = np.zeros((len(node_ids), len(codes)), dtype=np.float16)
+        for i, flags in enumerate(node_flags):
+            for iso, val in flags.items():
+                matrix[i, column[iso]] = val
+        attach_target_flags(G, codes, matrix)
+    elif "iso3_index" not in G.graph:
+        G.graph["iso3_index"] = {iso: j for j, iso in enumerate(G.graph["geo_iso3"].tolist())}
+    return G.graph["iso3_index"], G.graph["geo_flags_matrix"]
 
 
 def apply_geopolitics_to_graph(G):
@@ -76,70 +251,46 @@ def apply_geopolitics_to_graph(G):
       - geo_base_risk (float)
       - geo_target_flags (dict ISO3 -> extra risk)
       - geo_zones (list of zone_ids)
+    and refresh the target-flag matrix (see attach_target_flags).
     """
-    _, polygons, _ = load_geopolitics_config()
+    from backend.graph_builder import node_coords, attach_node_risks
 
-    for node_id, data in G.nodes(data=True):
-        lat = data.get("lat")
-        lon = data.get("lon")
-        if lat is None or lon is None:
-            continue
-
-        p = Point(float(lon), float(lat))
-
-        base_max = 0.0
-        flags: Dict[str, float] = {}
-        zones: List[str] = []
+    node_ids, coords = node_coords(G)
+    polygons = load_geopolitics_config().polygons
+    if len(coords):
+        lat_min, lon_min = coords.min(axis=0).tolist()
+        lat_max, lon_max = coords.max(axis=0).tolist()
+        polygons = polygons_in_bbox(polygons, (lon_min, lat_min, lon_max, lat_max))
+    base_max, flags, zones, flags_matrix = geopolitics_at(polygons, coords[:, 0], coords[:, 1])
 
-        for poly, base_risk, target_flags, zone_id, name, notes in polygons:
-            if not poly.contains(p):
-                continue
+    nodes = G.nodes
+    for node_id, base_risk, node_flags, node_zones in zip(node_ids, base_max.tolist(), flags, zones):
+        data = nodes[node_id]
+        data["geo_base_risk"] = base_risk
+        data["geo_target_flags"] = node_flags
+        data["geo_zones"] = node_zones
+    attach_target_flags(G, iso3_codes(polygons), flags_matrix)
+    attach_node_risks(G)
 
-            if base_risk > base_max:
-                base_max = base_risk
-
-            # Keep the max extra per ISO3
-            for iso, val in target_flags.items():
-                current = flags.get(iso, 0.0)
-                if val > current:
-                    flags[iso] = val
 
-            if zone_id not in zones:
-                zones.append(zone_id)
-
-        if base_max > 0.0 or flags or zones:
-            data["geo_base_risk"] = base_max
-            data["geo_target_flags"] = flags
-            data["geo_zones"] = zones
-        else:
-            data["geo_base_risk"] = 0.0
-            data["geo_target_flags"] = {}
-            data["geo_zones"] = []
+@lru_cache(maxsize=1)
+def _zone_metadata() -> Dict[str, Dict[str, str]]:
+    return dict(sorted(load_geopolitics_config().zone_metadata.items()))
 
 
 def get_zone_metadata() -> Dict[str, Dict[str, str]]:
     """
     Build a small metadata map:
       zone_id -> {"name": str, "notes": str}
+    with keys in sorted order. Zones without a zone_id / id property get no
+    entry (and so no route alert). Built once per loaded config and shared;
+    callers must not mutate it.
     """
-    path = GEOPOLITICS_GEOJSON_PATH
-    if not path.exists():
+    try:
+        return _zone_metadata()
+    except FileNotFoundError:
         return {}
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    meta: Dict[str, Dict[str, str]] = {}
-    for feat in data.get("features", []):
-        fprops = feat.get("properties", {}) or {}
-        zone_id = fprops.get("zone_id") or fprops.get("id")
-        if not zone_id:
-            continue
-        name = fprops.get("name", str(zone_id))
-        notes = fprops.get("notes", "")
-        meta[str(zone_id)] = {"name": name, "notes": notes}
-    return meta
-
 
 def infer_vessel_iso3_from_origin_country(origin_country: str | None) -> str | None:
     """
@@ -149,7 +300,7 @@ def infer_vessel_iso3_from_origin_country(origin_country: str | None) -> str | N
     if not origin_country:
         return None
     try:
-        _, _, aliases = load_geopolitics_config()
+        aliases = load_geopolitics_config().country_aliases
     except Exception:
         return None
 
@@ -1,27 +1,48 @@
 # backend/graph_builder.py
 from __future__ import annotations
 
-from typing import Dict, Tuple
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import json
+import os
 
 import networkx as nx
 import numpy as np
-from shapely.geometry import Point, Polygon
+import shapely
+from shapely.geometry import Polygon
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional: nearest-node lookups fall back to a NumPy scan
+    cKDTree = None
 
 from backend.config import (
     GRID_LAT_STEP,
     GRID_LON_STEP,
     GRAPH_PICKLE_PATH,
+    GRAPH_NPZ_PATH,
+    GRAPH_ARRAYS_DIR,
+    EARTH_RADIUS_NM,
 )
 from backend.data_sources import (
     load_bathymetry,
     load_piracy_zones,
     load_weather_zones,
-    is_shallow,
-    is_land,
+    is_shallow_batch,
+    is_land_batch,
+    points_in_polygons,
+    polygons_in_bbox,
 )
 from backend.models import RiskLayer
-from backend.geopolitics import load_geopolitics_config
-from haversine import haversine
+from backend.geopolitics import load_geopolitics_config, geopolitics_at, iso3_codes, attach_target_flags
+
+
+def haversine_nm(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in nautical miles between arrays of points given in degrees."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    s_lat = np.sin((lat2 - lat1) * 0.5)
+    s_lon = np.sin((lon2 - lon1) * 0.5)
+    return 2.0 * EARTH_RADIUS_NM * np.arcsin(np.sqrt(s_lat * s_lat + np.cos(lat1) * np.cos(lat2) * s_lon * s_lon))
 
 
 def build_risk_polygons():
@@ -40,36 +61,43 @@ def build_risk_polygons():
         (Polygon([[lon, lat] for lat, lon in feature.polygon]), feature.severity or 2)
         for feature in weather_layer.features
     ]
+    # Build each polygon's edge index once, up front, for the containment tests
+    shapely.prepare([poly for poly, _ in piracy_polygons + weather_polygons])
 
     return piracy_layer, weather_layer, piracy_polygons, weather_polygons
 
 
+def _max_level_inside(polygons, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    For each point, the max level among (polygon, level) pairs whose polygon
+    contains it (0 if none).
+    """
+    poly_levels = np.array([level for _, level in polygons], dtype=np.int64)
+
+    levels = np.zeros(len(lats), dtype=np.int64)
+    point_idx, poly_idx = points_in_polygons([poly for poly, _ in polygons], lats, lons)
+    np.maximum.at(levels, point_idx, poly_levels[poly_idx])
+    return levels
+
+
 def compute_node_risks(
-    lat: float,
-    lon: float,
+    lats: np.ndarray,
+    lons: np.ndarray,
     piracy_polygons,
     weather_polygons,
     bathy_ds,
-) -> Tuple[int, int, float]:
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Return (piracy_risk, weather_risk, depth_penalty) for a single node.
+    Return (piracy_risk, weather_risk, depth_penalty) arrays for arrays of nodes.
     - piracy/weather: max value among polygons containing the point
     - depth_penalty: 1.0 if shallow, else 0.0
     """
-    point = Point(lon, lat)
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
 
-    piracy_risk = 0
-    for poly, level in piracy_polygons:
-        if poly.contains(point):
-            piracy_risk = max(piracy_risk, level)
-
-    weather_risk = 0
-    for poly, sev in weather_polygons:
-        if poly.contains(point):
-            weather_risk = max(weather_risk, sev)
-
-    shallow = is_shallow(bathy_ds, lat, lon)
-    depth_penalty = 1.0 if shallow else 0.0
+    piracy_risk = _max_level_inside(piracy_polygons, lats, lons)
+    weather_risk = _max_level_inside(weather_polygons, lats, lons)
+    depth_penalty = np.where(is_shallow_batch(bathy_ds, lats, lons), 1.0, 0.0)
 
     return piracy_risk, weather_risk, depth_penalty
 
@@ -79,9 +107,11 @@ def build_grid_graph(
     lon_range: Tuple[float, float],
 ) -> Tuple[nx.Graph, RiskLayer, RiskLayer]:
     """
-    Build a sea-grid graph with node attributes:
+    Build a sea-grid graph keyed by integer node ids (see lat_lon_of) with node attributes:
+      - lat, lon
       - piracy_risk, weather_risk, depth_penalty
       - geo_base_risk, geo_target_flags (ISO3 → extra risk)
+    and the target flags as a matrix in G.graph (see attach_target_flags).
     Edges carry geodesic distance in nautical miles.
     """
 
@@ -98,85 +128,455 @@ def build_grid_graph(
     lat_values = np.arange(lat_min, lat_max + GRID_LAT_STEP, GRID_LAT_STEP)
     lon_values = np.arange(lon_min, lon_max + GRID_LON_STEP, GRID_LON_STEP)
 
-    # ── Nodes: only water cells; attach risks
-    for lat in lat_values:
-        for lon in lon_values:
-            # skip land cells early
-            if is_land(bathy_ds, float(lat), float(lon)):
-                continue
-
-            piracy_risk, weather_risk, depth_penalty = compute_node_risks(
-                float(lat),
-                float(lon),
-                piracy_polygons,
-                weather_polygons,
-                bathy_ds,
-            )
-
-            point = Point(float(lon), float(lat))
-
-            # Geopolitics at node: max base risk + max per-target extra
-            geo_base_risk = 0.0
-            geo_target_flags: Dict[str, float] = {}
-            for poly, base_risk, target_flags, *_ in geopolitics_polygons:
-                if poly.contains(point):
-                    if base_risk > geo_base_risk:
-                        geo_base_risk = base_risk
-                    for iso3, extra in target_flags.items():
-                        prev = geo_target_flags.get(iso3, 0.0)
-                        if extra > prev:
-                            geo_target_flags[iso3] = float(extra)
-
-            node_id = f"{lat:.3f},{lon:.3f}"
-            G.add_node(
-                node_id,
-                lat=float(lat),
-                lon=float(lon),
-                piracy_risk=piracy_risk,
-                weather_risk=weather_risk,
-                depth_penalty=depth_penalty,
-                geo_base_risk=geo_base_risk,
-                geo_target_flags=geo_target_flags,
-            )
+    # Only zones overlapping the grid can affect a node (the layers stay complete)
+    grid_bbox = (lon_values[0], lat_values[0], lon_values[-1], lat_values[-1])
+    piracy_polygons = polygons_in_bbox(piracy_polygons, grid_bbox)
+    weather_polygons = polygons_in_bbox(weather_polygons, grid_bbox)
+    geopolitics_polygons = polygons_in_bbox(geopolitics_polygons, grid_bbox)
+
+    # ── Nodes: only water cells (land mask for the whole grid in one lookup)
+    lat_grid, lon_grid = np.meshgrid(lat_values, lon_values, indexing="ij")
+    water_mask = ~is_land_batch(bathy_ds, lat_grid, lon_grid)
+    water_lats = lat_grid[water_mask]  # row-major: same order as a lat-then-lon loop
+    water_lons = lon_grid[water_mask]
+    water_cells = list(zip(water_lats.tolist(), water_lons.tolist()))
+
+    # Integer node id = row * n_cols + col; lat_lon_of() inverts it
+    n_rows, n_cols = water_mask.shape
+    rows, cols = np.nonzero(water_mask)
+    node_ids = (rows * n_cols + cols).tolist()
+    G.graph["lat_values"] = lat_values
+    G.graph["lon_values"] = lon_values
+
+    # Risks for all water cells at once (point-in-polygon runs in shapely's C loop)
+    piracy_risk, weather_risk, depth_penalty = compute_node_risks(
+        water_lats,
+        water_lons,
+        piracy_polygons,
+        weather_polygons,
+        bathy_ds,
+    )
+
+    # Geopolitics at node: max base risk + max per-target extra
+    geo_base_risk, geo_target_flags, _geo_zones, geo_flags_matrix = geopolitics_at(
+        geopolitics_polygons, water_lats, water_lons
+    )
+
+    for node_id, (lat, lon), p_risk, w_risk, d_penalty, g_risk, g_flags in zip(
+        node_ids,
+        water_cells,
+        piracy_risk.tolist(),
+        weather_risk.tolist(),
+        depth_penalty.tolist(),
+        geo_base_risk.tolist(),
+        geo_target_flags,
+    ):
+        G.add_node(
+            node_id,
+            lat=lat,
+            lon=lon,
+            piracy_risk=p_risk,
+            weather_risk=w_risk,
+            depth_penalty=d_penalty,
+            geo_base_risk=g_risk,
+            geo_target_flags=g_flags,
+        )
 
     # ── Edges: 4-neighborhood (N/S/E/W) with geodesic distance in NM
-    for lat in lat_values:
-        for lon in lon_values:
-            node_id = f"{lat:.3f},{lon:.3f}"
-            if node_id not in G.nodes:
-                continue
-
-            neighbors = [
-                (lat + GRID_LAT_STEP, lon),
-                (lat - GRID_LAT_STEP, lon),
-                (lat, lon + GRID_LON_STEP),
-                (lat, lon - GRID_LON_STEP),
-            ]
-            for n_lat, n_lon in neighbors:
-                n_id = f"{n_lat:.3f},{n_lon:.3f}"
-                if n_id in G.nodes:
-                    p1 = (lat, lon)
-                    p2 = (n_lat, n_lon)
-                    dist_km = haversine(p1, p2)
-                    dist_nm = dist_km * 0.539957
-                    G.add_edge(node_id, n_id, distance_nm=dist_nm)
-
+    # On a regular grid an edge's length only depends on its latitude row:
+    # one haversine per row and direction instead of one per edge.
+    north_nm = haversine_nm(lat_values, 0.0, lat_values + GRID_LAT_STEP, 0.0)
+    east_nm = haversine_nm(lat_values, 0.0, lat_values, GRID_LON_STEP)
+
+    # Grid cell -> node position (-1 for land), so neighbor tests are array lookups
+    grid_index = np.full(water_mask.shape, -1, dtype=np.int64)
+    grid_index[rows, cols] = np.arange(len(rows))
+
+    # Undirected: linking every node to its N and E neighbors covers S and W too.
+    # Interleaving them per node keeps the adjacency order of the old per-cell loop.
+    north = np.full(len(rows), -1, dtype=np.int64)
+    has_row = rows + 1 < n_rows
+    north[has_row] = grid_index[rows[has_row] + 1, cols[has_row]]
+    east = np.full(len(rows), -1, dtype=np.int64)
+    has_col = cols + 1 < n_cols
+    east[has_col] = grid_index[rows[has_col], cols[has_col] + 1]
+
+    targets = np.column_stack([north, east])
+    lengths = np.column_stack([north_nm[rows], east_nm[rows]])
+    sources = np.repeat(np.arange(len(rows)), 2).reshape(-1, 2)
+    linked = targets >= 0
+
+    G.add_edges_from(
+        (node_ids[u], node_ids[v], {"distance_nm": dist_nm})
+        for u, v, dist_nm in zip(sources[linked].tolist(), targets[linked].tolist(), lengths[linked].tolist())
+    )
+
+    attach_node_coords(G)
+    attach_target_flags(G, iso3_codes(geopolitics_polygons), geo_flags_matrix)
+    attach_node_risks(G)
     return G, piracy_layer, weather_layer
 
 
+def attach_node_coords(G: nx.Graph) -> None:
+    """
+    Store a contiguous (struct-of-arrays) snapshot of node coordinates:
+      - G.graph["node_order"]: node ids with lat/lon, in graph order
+      - G.graph["coords"]: float64 array (N, 2) of [lat, lon], same order
+    Coordinates are fixed after construction, so hot paths can read these
+    arrays instead of walking every per-node attribute dict.
+    """
+    node_order = []
+    coords = []
+    for node_id, data in G.nodes(data=True):
+        lat = data.get("lat")
+        lon = data.get("lon")
+        if lat is None or lon is None:
+            continue
+        node_order.append(node_id)
+        coords.append((lat, lon))
+
+    G.graph["node_order"] = node_order
+    G.graph["coords"] = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def lat_lon_of(G: nx.Graph, node_id) -> Tuple[float, float]:
+    """
+    (lat, lon) of a node. Grid nodes use integer ids (row * n_lon + col) into
+    G.graph["lat_values"] / ["lon_values"]; other graphs (e.g. pickled ones
+    with "lat,lon" string ids) fall back to the node's lat/lon attributes.
+    """
+    lat_values = G.graph.get("lat_values")
+    if lat_values is None or not isinstance(node_id, (int, np.integer)):
+        data = G.nodes[node_id]
+        return data["lat"], data["lon"]
+    lon_values = G.graph["lon_values"]
+    row, col = divmod(int(node_id), len(lon_values))
+    return float(lat_values[row]), float(lon_values[col])
+
+
+def node_coords(G: nx.Graph) -> Tuple[List, np.ndarray]:
+    """
+    Return (node_order, coords) for G, (re)building the snapshot when missing
+    (e.g. graphs pickled before it existed) or stale after nodes were added/removed.
+    """
+    node_order = G.graph.get("node_order")
+    if node_order is None or len(node_order) != G.number_of_nodes():
+        attach_node_coords(G)
+    return G.graph["node_order"], G.graph["coords"]
+
+
+# Per-node risk attributes mirrored into arrays for routing (see attach_node_risks)
+NODE_RISK_ATTRS = ("piracy_risk", "weather_risk", "depth_penalty", "traffic_risk", "geo_base_risk")
+
+
+def attach_node_risks(G: nx.Graph) -> None:
+    """
+    Store a struct-of-arrays copy of the NODE_RISK_ATTRS node attributes:
+      - G.graph["node_index"]: node id -> position in node_coords order
+      - G.graph["node_risks"]: attribute -> float64 array (N,), missing = 0.0
+      - G.graph["risk_version"]: bumped on every refresh
+    Unlike coordinates these change at runtime: anything that rewrites one of
+    the attributes must call this again so routing sees the new values.
+    """
+    node_order, _coords = node_coords(G)
+    nodes = G.nodes
+    G.graph["node_index"] = {node_id: i for i, node_id in enumerate(node_order)}
+    G.graph["node_risks"] = {
+        attr: np.fromiter(
+            (nodes[node_id].get(attr, 0.0) for node_id in node_order),
+            dtype=np.float64,
+            count=len(node_order),
+        )
+        for attr in NODE_RISK_ATTRS
+    }
+    G.graph["risk_version"] = G.graph.get("risk_version", 0) + 1
+
+
+def node_risks(G: nx.Graph) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Return (node_index, node_risks) for G, building them when missing or stale in size."""
+    node_index = G.graph.get("node_index")
+    if node_index is None or len(node_index) != len(node_coords(G)[0]):
+        attach_node_risks(G)
+    return G.graph["node_index"], G.graph["node_risks"]
+
+
+def node_risk_version(G: nx.Graph) -> int:
+    """Current G.graph["risk_version"], attaching the risk arrays first if they are missing (e.g. a freshly loaded graph)."""
+    node_risks(G)
+    return G.graph["risk_version"]
+
+
+def edge_arrays(G: nx.Graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (edge_u, edge_v, distance_nm) for every edge in G.edges order, endpoints as
+    positions in node_coords order (distance_nm defaults to 1.0, as in routing).
+    Built on first use and kept with the node snapshot: like coordinates, the
+    grid's topology is fixed once built (number_of_edges() is O(N) in networkx,
+    too slow to check per route).
+    """
+    node_order, _coords = node_coords(G)
+    cached = G.graph.get("edge_arrays")
+    if cached is None or cached[0] is not node_order:
+        position = {node_id: i for i, node_id in enumerate(node_order)}
+        edges = list(G.edges(data="distance_nm", default=1.0))
+        edge_u = np.fromiter((position[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+        edge_v = np.fromiter((position[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+        dist_nm = np.fromiter((d for _, _, d in edges), dtype=np.float64, count=len(edges))
+        cached = (node_order, edge_u, edge_v, dist_nm)
+        G.graph["edge_arrays"] = cached
+    return cached[1], cached[2], cached[3]
+
+
+def unit_vectors(lats, lons) -> np.ndarray:
+    """(N, 3) points on the unit sphere; chord length grows monotonically with great-circle distance."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def node_kdtree(G: nx.Graph):
+    """
+    KD-tree over the unit vectors of node_coords(G), so the nearest nodes by
+    great-circle distance are nearest by chord in 3D. Built on first use and
+    kept until the coordinate snapshot changes; None without scipy.
+    """
+    if cKDTree is None:
+        return None
+    _node_order, coords = node_coords(G)
+    cached = G.graph.get("node_tree")
+    if cached is None or cached[0] is not coords:
+        cached = (coords, cKDTree(unit_vectors(coords[:, 0], coords[:, 1])))
+        G.graph["node_tree"] = cached
+    return cached[1]
+
+
+# Narrower dtypes tried, in order, for numeric columns (see _narrow)
+_NARROW_DTYPES = (np.int8, np.uint8, np.int16, np.float16, np.float32)
+
+
+def _narrow(values: np.ndarray) -> np.ndarray:
+    """
+    Smallest of _NARROW_DTYPES that holds `values` exactly (risk levels and
+    0/1 penalties fit in a byte), else `values` unchanged. Never lossy.
+    """
+    for dtype in _NARROW_DTYPES:
+        if np.dtype(dtype).itemsize >= values.dtype.itemsize:
+            break
+        with np.errstate(all="ignore"):
+            narrowed = values.astype(dtype)
+        if np.array_equal(narrowed.astype(values.dtype), values):
+            return narrowed
+    return values
+
+
+# G.graph entries rebuilt on demand (node_coords, node_risks, edge_arrays, node_kdtree,
+# target_flags_matrix, routing._csr_layout / _route_weights); not worth persisting
+_DERIVED_GRAPH_KEYS = (
+    "node_order", "coords", "iso3_index", "node_tree", "node_index", "node_risks", "edge_arrays", "route_csr",
+    "route_weights",
+)
+
+
+def _encode_columns(prefix: str, rows: List[dict], arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Store one attribute column per key into `arrays`:
+      - numeric columns as f"{prefix}__{key}" arrays (values of the rows that have the key),
+        narrowed losslessly (see _narrow) with the original dtype under f"{prefix}_dtype__{key}"
+      - dict/list columns as UTF-8 JSON [[row, value], ...] of the non-empty values
+        (f"{prefix}_json__{key}"), with the empty container type under f"{prefix}_empty__{key}"
+      - f"{prefix}_mask__{key}" marks which rows have the key, if not all of them do
+    """
+    keys: Dict[str, None] = {}
+    for row in rows:
+        keys.update(dict.fromkeys(row))
+
+    for key in keys:
+        present = [key in row for row in rows]
+        values = [row[key] for row, has in zip(rows, present) if has]
+        if not all(present):
+            arrays[f"{prefix}_mask__{key}"] = np.asarray(present, dtype=bool)
+
+        if all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values):
+            column = np.asarray(values)
+            narrowed = _narrow(column)
+            if narrowed.dtype != column.dtype:
+                arrays[f"{prefix}_dtype__{key}"] = np.asarray(column.dtype.str)
+            arrays[f"{prefix}__{key}"] = narrowed
+            continue
+
+        container = type(values[0]) if values and isinstance(values[0], (dict, list)) else None
+        if container is not None and all(type(v) is container for v in values):
+            arrays[f"{prefix}_empty__{key}"] = np.asarray(container.__name__)
+            pairs = [[i, v] for i, v in enumerate(values) if v]
+        else:
+            pairs = list(enumerate(values))
+        arrays[f"{prefix}_json__{key}"] = np.frombuffer(json.dumps(pairs).encode(), dtype=np.uint8)
+
+
+def _decode_columns(prefix: str, n_rows: int, data) -> List[dict]:
+    """Inverse of _encode_columns: one attribute dict per row."""
+    files = data.files
+    keys = [name.split("__", 1)[1] for name in files if name.startswith((f"{prefix}__", f"{prefix}_json__"))]
+    rows: List[dict] = [{} for _ in range(n_rows)]
+
+    for key in keys:
+        mask_name = f"{prefix}_mask__{key}"
+        targets = rows
+        if mask_name in files:
+            targets = [rows[i] for i in np.flatnonzero(data[mask_name]).tolist()]
+
+        if f"{prefix}__{key}" in files:
+            column = data[f"{prefix}__{key}"]
+            dtype_name = f"{prefix}_dtype__{key}"
+            if dtype_name in files:
+                # Back to the original dtype so values come out as the same Python types
+                column = column.astype(str(data[dtype_name]))
+            for row, value in zip(targets, column.tolist()):
+                row[key] = value
+            continue
+
+        empty_name = f"{prefix}_empty__{key}"
+        if empty_name in files:
+            container = dict if str(data[empty_name]) == "dict" else list
+            for row in targets:
+                row[key] = container()
+        for i, value in json.loads(data[f"{prefix}_json__{key}"].tobytes()):
+            targets[i][key] = value
+    return rows
+
+
+def _write_atomically(path: Path, write: Callable) -> None:
+    """
+    Run write(file) on a temporary file next to path, then os.replace it in:
+    readers, and other workers saving the same graph at once, never see a
+    partially written file.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 def save_graph(G: nx.Graph):
-    """Persist graph to disk (pickle)."""
-    import pickle
+    """
+    Persist graph to disk as a flat .npz (GRAPH_NPZ_PATH): node ids, one array
+    per numeric node/edge attribute and the edge list as (u, v) node positions.
+    Much smaller and faster to load than pickling per-node / per-edge dicts.
+    """
+    nodes = list(G.nodes)
+    position = {node_id: i for i, node_id in enumerate(nodes)}
 
-    GRAPH_PICKLE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(GRAPH_PICKLE_PATH, "wb") as f:
-        pickle.dump(G, f)
+    arrays: Dict[str, np.ndarray] = {"nodes": np.asarray(nodes)}
+    _encode_columns("node", [data for _, data in G.nodes(data=True)], arrays)
 
+    # Edge list in G.edges order; rebuilding from it keeps each node's adjacency order
+    edges = list(G.edges(data=True))
+    arrays["edge_u"] = np.asarray([position[u] for u, _, _ in edges], dtype=np.int64)
+    arrays["edge_v"] = np.asarray([position[v] for _, v, _ in edges], dtype=np.int64)
+    _encode_columns("edge", [data for _, _, data in edges], arrays)
 
-def load_graph() -> nx.Graph:
-    """Load graph from disk (pickle)."""
-    import pickle
+    for key, value in G.graph.items():
+        if key not in _DERIVED_GRAPH_KEYS and isinstance(value, np.ndarray):
+            arrays[f"graph__{key}"] = value
+
+    GRAPH_NPZ_PATH.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomically(GRAPH_NPZ_PATH, lambda f: np.savez(f, **arrays))
+    save_graph_arrays(G)
+
+
+# Files under GRAPH_ARRAYS_DIR (see save_graph_arrays)
+_GRAPH_ARRAY_FILES = ("nodes", "coords", "edge_u", "edge_v", "edge_dist_nm")
+
+
+def save_graph_arrays(G: nx.Graph) -> None:
+    """
+    Write the fixed struct-of-arrays snapshots (node_coords and edge_arrays)
+    as one .npy per array under GRAPH_ARRAYS_DIR, so load_graph can map them
+    instead of rebuilding them from the per-node / per-edge dicts. Skipped
+    (and any stale copy removed) when some node has no coordinates, since
+    node_coords order then isn't G.nodes order.
+    """
+    node_order, coords = node_coords(G)
+    for name in _GRAPH_ARRAY_FILES:
+        (GRAPH_ARRAYS_DIR / f"{name}.npy").unlink(missing_ok=True)
+    if len(node_order) != G.number_of_nodes():
+        return
+
+    edge_u, edge_v, dist_nm = edge_arrays(G)
+    arrays = {
+        "nodes": np.asarray(node_order),
+        "coords": coords,
+        "edge_u": edge_u,
+        "edge_v": edge_v,
+        "edge_dist_nm": dist_nm,
+    }
+    GRAPH_ARRAYS_DIR.mkdir(parents=True, exist_ok=True)
+    # "nodes" last: _attach_graph_arrays treats a missing file as no snapshot
+    for name in reversed(_GRAPH_ARRAY_FILES):
+        _write_atomically(
+            GRAPH_ARRAYS_DIR / f"{name}.npy",
+            lambda f, array=arrays[name]: np.save(f, array, allow_pickle=False),
+        )
+
+
+def _attach_graph_arrays(G: nx.Graph) -> None:
+    """
+    Seed node_coords / edge_arrays from GRAPH_ARRAYS_DIR, memory-mapped
+    read-only: pages load lazily and are shared (via the page cache) by every
+    worker process serving the same files. Ignored unless the saved node ids,
+    in order, and the edge count match G.
+    """
+    paths = [GRAPH_ARRAYS_DIR / f"{name}.npy" for name in _GRAPH_ARRAY_FILES]
+    if not all(path.exists() for path in paths):
+        return
+    nodes, coords, edge_u, edge_v, dist_nm = (
+        np.load(path, mmap_mode="r", allow_pickle=False) for path in paths
+    )
+    node_order = list(G.nodes)
+    if len(nodes) != len(node_order) or nodes.tolist() != node_order:
+        return
+    if len(edge_u) != G.number_of_edges():
+        return
+
+    G.graph["node_order"] = node_order
+    G.graph["coords"] = coords
+    G.graph["edge_arrays"] = (node_order, edge_u, edge_v, dist_nm)
 
-    with open(GRAPH_PICKLE_PATH, "rb") as f:
-        G: nx.Graph = pickle.load(f)
+
+def graph_cache_exists() -> bool:
+    """True if a saved graph (npz, or a legacy pickle) is available."""
+    return GRAPH_NPZ_PATH.exists() or GRAPH_PICKLE_PATH.exists()
+
+
+def load_graph() -> nx.Graph:
+    """Load graph from disk: the .npz written by save_graph, else a legacy pickle."""
+    if not GRAPH_NPZ_PATH.exists():
+        import pickle
+
+        with open(GRAPH_PICKLE_PATH, "rb") as f:
+            G: nx.Graph = pickle.load(f)
+        _attach_graph_arrays(G)
+        return G
+
+    with np.load(GRAPH_NPZ_PATH, allow_pickle=False) as data:
+        nodes = data["nodes"].tolist()
+        node_attrs = _decode_columns("node", len(nodes), data)
+        edge_u = data["edge_u"].tolist()
+        edge_v = data["edge_v"].tolist()
+        edge_attrs = _decode_columns("edge", len(edge_u), data)
+        graph_attrs = {
+            name.split("__", 1)[1]: data[name] for name in data.files if name.startswith("graph__")
+        }
+
+    # Edges in saved G.edges order, which reproduces each node's neighbor order
+    G = nx.Graph(**graph_attrs)
+    G.add_nodes_from(zip(nodes, node_attrs))
+    G.add_edges_from(
+        (nodes[u], nodes[v], attrs) for u, v, attrs in zip(edge_u, edge_v, edge_attrs)
+    )
+    _attach_graph_arrays(G)
     return G
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
 import math
 import logging
+import sqlite3
+import threading
+import time
 
 import networkx as nx
+import numpy as np
 import requests
 
+from backend.graph_builder import node_coords, node_risks, attach_node_risks
 from backend.config import (
     WEATHER_API_BASE_URL,
     WEATHER_CELL_SIZE_DEG,
@@ -14,12 +22,49 @@ from backend.config import (
     WIND_SPEED_THRESHOLD_MS,
     WEATHER_WAVE_WEIGHT,
     WEATHER_WIND_WEIGHT,
+    WEATHER_CACHE_PATH,
 )
 
 logger = logging.getLogger(__name__)
 
 MAX_WEATHER_CELLS = 10000
 
+# Concurrent requests to the marine API (the fetch is network-latency bound)
+WEATHER_FETCH_WORKERS = 16
+# Retries after a 429, waiting Retry-After or WEATHER_BACKOFF_SEC * 2**attempt
+WEATHER_FETCH_RETRIES = 3
+WEATHER_BACKOFF_SEC = 1.0
+# A Retry-After longer than this many backoff steps gives up on the cell (stale value used)
+WEATHER_RETRY_AFTER_MAX_FACTOR = 4
+
+# Per-thread requests.Session ("session") and weather-cache connection ("cache")
+_thread_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """Per-thread requests.Session, so each worker keeps its connection alive."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    return session
+
+
+def _retry_delay(resp: requests.Response, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying a rate-limited request, or None to give up
+    when the server asks for a longer wait than WEATHER_RETRY_AFTER_MAX_FACTOR
+    backoff steps (so one cell can't park a fetch thread, and startup, for minutes).
+    """
+    backoff = WEATHER_BACKOFF_SEC * (2 ** attempt)
+    retry_after = resp.headers.get("Retry-After")
+    try:
+        delay = max(float(retry_after), 0.0)
+    except (TypeError, ValueError):
+        return backoff
+    if delay > backoff * WEATHER_RETRY_AFTER_MAX_FACTOR:
+        return None
+    return delay
+
 
 def _cell_for_latlon(lat: float, lon: float) -> Tuple[float, float]:
     """Bucket coordinates into cells to reduce API calls."""
@@ -42,9 +87,86 @@ def _first_valid_float(seq) -> Optional[float]:
     return None
 
 
+def _open_cache() -> Optional[sqlite3.Connection]:
+    """Per-thread connection to the on-disk weather cache (None if it can't be opened)."""
+    conn = getattr(_thread_local, "cache", None)
+    if conn is None:
+        try:
+            WEATHER_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(WEATHER_CACHE_PATH, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")  # fetch workers read/write concurrently
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS weather_cells ("
+                " cell_lat REAL, cell_lon REAL, hour TEXT, wave REAL, wind REAL,"
+                " PRIMARY KEY (cell_lat, cell_lon, hour))"
+            )
+        except sqlite3.Error as exc:
+            logger.warning(f"[weather] Cache unavailable at {WEATHER_CACHE_PATH}: {exc}")
+            return None
+        _thread_local.cache = conn
+    return conn
+
+
+def _cache_lookup(cell_lat: float, cell_lon: float, hour: Optional[str]):
+    """
+    Cached (wave, wind) for the cell: for the given UTC hour, or the most
+    recent entry of any hour when hour is None. Returns None on a miss.
+    """
+    conn = _open_cache()
+    if conn is None:
+        return None
+    query = "SELECT wave, wind FROM weather_cells WHERE cell_lat = ? AND cell_lon = ?"
+    args: tuple = (cell_lat, cell_lon)
+    if hour is not None:
+        query += " AND hour = ?"
+        args += (hour,)
+    try:
+        return conn.execute(query + " ORDER BY hour DESC LIMIT 1", args).fetchone()
+    except sqlite3.Error:
+        return None
+
+
+def _cache_store(cell_lat: float, cell_lon: float, hour: str, wave, wind) -> None:
+    conn = _open_cache()
+    if conn is None:
+        return
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO weather_cells VALUES (?, ?, ?, ?, ?)",
+                (cell_lat, cell_lon, hour, wave, wind),
+            )
+    except sqlite3.Error as exc:
+        logger.debug(f"[weather] Could not cache cell ({cell_lat}, {cell_lon}): {exc}")
+
+
 def fetch_wave_wind_for_cell(cell_lat: float, cell_lon: float) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Wave height (m) and 10m wind speed (m/s) at the cell center.
+    Served from the on-disk cache when this UTC hour was already fetched;
+    otherwise fetched from Open-Meteo Marine and cached. If the API fails,
+    the most recent cached value for the cell (if any) is returned instead.
+    """
+    cell_lat, cell_lon = round(cell_lat, 2), round(cell_lon, 2)
+    hour = datetime.now(timezone.utc).strftime("%Y%m%d%H")
+
+    cached = _cache_lookup(cell_lat, cell_lon, hour)
+    if cached is not None:
+        return cached[0], cached[1]
+
+    fetched = _fetch_from_api(cell_lat, cell_lon)
+    if fetched is None:
+        stale = _cache_lookup(cell_lat, cell_lon, None)
+        return (stale[0], stale[1]) if stale is not None else (None, None)
+
+    _cache_store(cell_lat, cell_lon, hour, *fetched)
+    return fetched
+
+
+def _fetch_from_api(cell_lat: float, cell_lon: float) -> Optional[Tuple[Optional[float], Optional[float]]]:
     """
     Fetch wave height (m) and 10m wind speed (m/s) at the cell center using Open-Meteo Marine.
+    Returns None if the request fails.
     """
     params = {
         "latitude": cell_lat,
@@ -54,15 +176,20 @@ def fetch_wave_wind_for_cell(cell_lat: float, cell_lon: float) -> Tuple[Optional
         "cell_selection": "sea",
     }
     try:
-        resp = requests.get(WEATHER_API_BASE_URL, params=params, timeout=10)
-        if resp.status_code == 429:
-            logger.warning(f"[weather] Rate limit (429) for cell ({cell_lat}, {cell_lon})")
-            return None, None
+        for attempt in range(WEATHER_FETCH_RETRIES + 1):
+            resp = _session().get(WEATHER_API_BASE_URL, params=params, timeout=10)
+            if resp.status_code != 429:
+                break
+            delay = _retry_delay(resp, attempt)
+            if attempt == WEATHER_FETCH_RETRIES or delay is None:
+                logger.warning(f"[weather] Rate limit (429) for cell ({cell_lat}, {cell_lon})")
+                return None
+            time.sleep(delay)
         resp.raise_for_status()
         data = resp.json()
     except Exception as exc:
         logger.warning(f"[weather] Error fetching marine data for cell ({cell_lat}, {cell_lon}): {exc}")
-        return None, None
+        return None
 
     hourly = data.get("hourly", {})
     wave = hourly.get("wave_height")
@@ -100,38 +227,38 @@ def update_graph_weather(G: nx.Graph) -> None:
     Updates per-node 'weather_risk' as a continuous penalty using wave + wind.
     Routing already averages node risks along edges, so no other changes needed.
     """
-    # 1) Group nodes into cells to minimize API calls
-    cells: Dict[Tuple[float, float], list[str]] = {}
-    for node_id, data in G.nodes(data=True):
-        lat = data.get("lat")
-        lon = data.get("lon")
-        if lat is None or lon is None:
-            continue
-        cell = _cell_for_latlon(lat, lon)
-        cells.setdefault(cell, []).append(node_id)
+    # 1) Group nodes into cells to minimize API calls (same bucketing as _cell_for_latlon)
+    node_ids, coords = node_coords(G)
+    node_cells = np.round(coords / WEATHER_CELL_SIZE_DEG) * WEATHER_CELL_SIZE_DEG
+    cells, node_cell_idx = np.unique(node_cells, axis=0, return_inverse=True)
+    node_cell_idx = node_cell_idx.ravel()
 
-    # 2) Randomize and cap number of cells (demo/perf)
-    cell_items = list(cells.items())
+    logger.info(f"[weather] Updating weather risk (wave+wind continuous) for {len(cells)} cells")
 
-    logger.info(f"[weather] Updating weather risk (wave+wind continuous) for {len(cell_items)} cells")
+    # 2) Fetch cells concurrently; one penalty per cell
+    with ThreadPoolExecutor(max_workers=WEATHER_FETCH_WORKERS) as pool:
+        results = pool.map(lambda cell: fetch_wave_wind_for_cell(*cell), [tuple(c) for c in cells.tolist()])
+        cell_penalty = np.fromiter(
+            (continuous_weather_penalty(wave_m, wind_ms) for wave_m, wind_ms in results),
+            dtype=np.float64,
+            count=len(cells),
+        )
 
-    # 3) Fetch per-cell; assign penalty to nodes in that cell
-    for (cell_lat, cell_lon), node_ids in cell_items:
-        wave_m, wind_ms = fetch_wave_wind_for_cell(cell_lat, cell_lon)
-        penalty = continuous_weather_penalty(wave_m, wind_ms)
-        for node_id in node_ids:
-            G.nodes[node_id]["weather_risk"] = penalty
+    # 3) Scatter cell penalties to nodes with one gather and one bulk attribute write
+    nx.set_node_attributes(G, dict(zip(node_ids, cell_penalty[node_cell_idx].tolist())), "weather_risk")
+    attach_node_risks(G)
 
     logger.info("[weather] Weather risk update complete")
 
+@lru_cache(maxsize=8)
+def _unit_circle(n: int) -> np.ndarray:
+    """(n+1, 2) array of [sin, cos] at angles 2*pi*i/n, i = 0..n (shared by every cell)."""
+    a = 2 * np.pi * np.arange(n + 1) / n
+    return np.column_stack([np.sin(a), np.cos(a)])
+
+
 def _circle_polygon_latlon(center_lat: float, center_lon: float, radius_deg: float, n: int = 28):
-    import math
-    pts = []
-    for i in range(n+1):
-        a = 2*math.pi * i / n
-        pts.append([center_lat + radius_deg*math.sin(a),
-                    center_lon + radius_deg*math.cos(a)])
-    return pts
+    return (_unit_circle(n) * radius_deg + (center_lat, center_lon)).tolist()
 
 def build_weather_risk_layer(G: nx.Graph, max_cells: int = 300, scale: float = 18.0):
     from backend.models import RiskLayer, RiskFeature
@@ -139,11 +266,9 @@ def build_weather_risk_layer(G: nx.Graph, max_cells: int = 300, scale: float = 1
 
     # Aggregate risk by fetch cell
     buckets = {}  # (clat, clon) -> [risk...]
-    for _, d in G.nodes(data=True):
-        lat, lon = d.get("lat"), d.get("lon")
-        if lat is None or lon is None:
-            continue
-        risk = float(d.get("weather_risk", 0.0))
+    _node_ids, coords = node_coords(G)
+    _node_index, risks = node_risks(G)
+    for lat, lon, risk in zip(coords[:, 0].tolist(), coords[:, 1].tolist(), risks["weather_risk"].tolist()):
         key = (
             round(lat / WEATHER_CELL_SIZE_DEG) * WEATHER_CELL_SIZE_DEG,
             round(lon / WEATHER_CELL_SIZE_DEG) * WEATHER_CELL_SIZE_DEG,
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
-from typing import Dict, Optional, List
-
+from typing import Dict, Iterable, Iterator, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
+import math
+
+import numpy as np
+import shapely
 import uvicorn
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
 
 from backend.models import (
     HealthResponse,
@@ -16,18 +24,27 @@ from backend.models import (
     RouteResponse,
     RiskLayersResponse,
     RiskLayer,
+    construct_trusted,
+    dump_json,
 )
 from backend.data_sources import (
     load_ports_from_wpi,
     load_piracy_zones,
     load_weather_zones,
 )
-from backend.graph_builder import load_graph, build_grid_graph, save_graph
-from backend.routing import compute_route
-from backend.config import GRAPH_PICKLE_PATH, AIS_LAT_RANGE, AIS_LON_RANGE
+from backend.graph_builder import (
+    load_graph,
+    build_grid_graph,
+    save_graph,
+    graph_cache_exists,
+    node_kdtree,
+    attach_node_risks,
+)
+from backend.routing import compute_route, port_node_map
+from backend.config import AIS_LAT_RANGE, AIS_LON_RANGE, ROUTE_WORKERS, GEOPOLITICS_RELOAD_SEC
 from backend.live_weather import update_graph_weather, build_weather_risk_layer
 from backend.ais_traffic import update_graph_traffic_from_ais, build_traffic_layer_from_graph
-from backend.geopolitics import load_geopolitics_config, apply_geopolitics_to_graph
+from backend.geopolitics import load_geopolitics_config, apply_geopolitics_to_graph, invalidate_geopolitics_config
 from backend.safety_layer import build_safety_layer_from_graph
 
 app = FastAPI(
@@ -52,24 +69,144 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Layer polygons compress ~10x. Level 5 gets within ~7% of level 9's size at
+# ~1/15 of the CPU (≈0.14 s vs 2.4 s for a 13 MB safety layer).
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# compute_route is CPU-bound: run it here so /health, /ports etc. stay responsive meanwhile
+ROUTE_POOL = ThreadPoolExecutor(max_workers=ROUTE_WORKERS, thread_name_prefix="route")
+
 # ── Globals (hot-reloaded by uvicorn in dev)
 PORTS: Dict[str, Port] = {}
+# (port, "id\0name\0country" lowercased) in PORTS order, so /ports/search does one `in` per port
+PORT_SEARCH_INDEX: List[Tuple[Port, str]] = []
+# port id -> nearest graph node, so /route doesn't search for port endpoints
+PORT_NODE: Dict[str, object] = {}
 GRAPH = None
+# Background task reloading the geopolitics GeoJSON when it is edited
+GEOPOLITICS_WATCHER: Optional[asyncio.Task] = None
 PIRACY_LAYER: Optional[RiskLayer] = None
 WEATHER_LAYER: Optional[RiskLayer] = None
 TRAFFIC_LAYER: Optional[RiskLayer] = None
 WEATHER_LIVE_LAYER: Optional[RiskLayer] = None
 GEOPOL_LAYER: Optional[RiskLayer] = None
 SAFETY_LAYER: Optional[RiskLayer] = None
+# id(layer) -> (layer, its JSON); layers are built once, so each is serialized once
+LAYER_JSON_CACHE: Dict[int, Tuple[RiskLayer, bytes]] = {}
+# id(layer) -> (layer, STRtree over its features' bounding boxes, tree position -> feature)
+LAYER_INDEX_CACHE: Dict[int, Tuple[RiskLayer, shapely.STRtree, np.ndarray]] = {}
+
+
+def layer_json(layer: RiskLayer) -> bytes:
+    """JSON bytes of a risk layer, serialized on first use and then reused."""
+    cached = LAYER_JSON_CACHE.get(id(layer))
+    if cached is None or cached[0] is not layer:
+        cached = (layer, dump_json(layer))
+        LAYER_JSON_CACHE[id(layer)] = cached
+    return cached[1]
+
+
+def refresh_layer_json() -> None:
+    """
+    Serialize the current layers up front (so no request pays for it) and
+    drop cached bytes of layers that have since been replaced.
+    """
+    global LAYER_JSON_CACHE
+    previous = LAYER_JSON_CACHE
+    LAYER_JSON_CACHE = {}
+    for layer in (PIRACY_LAYER, WEATHER_LAYER, WEATHER_LIVE_LAYER, TRAFFIC_LAYER, GEOPOL_LAYER, SAFETY_LAYER):
+        if layer is None:
+            continue
+        cached = previous.get(id(layer))
+        if cached is None or cached[0] is not layer:
+            cached = (layer, dump_json(layer))
+        LAYER_JSON_CACHE[id(layer)] = cached
+
+
+def layer_index(layer: RiskLayer) -> Tuple[shapely.STRtree, np.ndarray]:
+    """
+    STRtree over the [lon, lat] bounding boxes of a layer's feature polygons,
+    plus the feature position of each tree item (features without points are
+    left out). Built on first use per layer.
+    """
+    cached = LAYER_INDEX_CACHE.get(id(layer))
+    if cached is None or cached[0] is not layer:
+        lengths = np.fromiter((len(f.polygon) for f in layer.features), dtype=np.int64, count=len(layer.features))
+        feature_pos = np.flatnonzero(lengths > 0)
+        points = np.array([pt for f in layer.features for pt in f.polygon], dtype=np.float64).reshape(-1, 2)
+        starts = (np.cumsum(lengths) - lengths)[feature_pos]
+        if len(feature_pos):
+            lat_min, lon_min = np.minimum.reduceat(points, starts).T
+            lat_max, lon_max = np.maximum.reduceat(points, starts).T
+            boxes = shapely.box(lon_min, lat_min, lon_max, lat_max)
+        else:
+            boxes = np.empty(0, dtype=object)
+        cached = (layer, shapely.STRtree(boxes), feature_pos)
+        LAYER_INDEX_CACHE[id(layer)] = cached
+    return cached[1], cached[2]
+
+
+def layer_in_bbox(layer: RiskLayer, bbox: Tuple[float, float, float, float]) -> RiskLayer:
+    """Copy of layer with only the features whose bounding box meets bbox = (minLon, minLat, maxLon, maxLat)."""
+    tree, feature_pos = layer_index(layer)
+    hits = np.sort(feature_pos[tree.query(shapely.box(*bbox))])
+    return construct_trusted(
+        RiskLayer,
+        type=layer.type,
+        name=layer.name,
+        features=[layer.features[i] for i in hits.tolist()],
+    )
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Parse "minLon,minLat,maxLon,maxLat"; ValueError if malformed."""
+    parts = [float(p) for p in bbox.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must have 4 comma-separated numbers: minLon,minLat,maxLon,maxLat")
+    if not all(math.isfinite(p) for p in parts):
+        raise ValueError("bbox values must be finite numbers")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox minimums must not exceed maximums")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def model_response(model) -> Response:
+    """
+    JSON response straight from a model that is already validated, so FastAPI
+    doesn't validate it against response_model again before serializing.
+    """
+    return Response(content=dump_json(model), media_type="application/json")
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def iter_layers_json(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """A RiskLayersResponse body from per-layer JSON, one chunk per layer."""
+    yield b'{"layers":['
+    for i, chunk in enumerate(chunks):
+        if i:
+            yield b","
+        yield chunk
+    yield b"]}"
 
 
-# ── Init app (graph + static layers + live weather)
+def iter_layers_ndjson(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """NDJSON body from per-layer JSON: one RiskLayer per line."""
+    for chunk in chunks:
+        yield chunk + b"\n"
+
+
+# ── Init app (graph + static layers + geopolitics)
 def init_app():
-    global PORTS, GRAPH, PIRACY_LAYER, WEATHER_LAYER, WEATHER_LIVE_LAYER, GEOPOL_LAYER, SAFETY_LAYER
+    global PORTS, PORT_SEARCH_INDEX, PORT_NODE, GRAPH, PIRACY_LAYER, WEATHER_LAYER, GEOPOL_LAYER
 
     PORTS = load_ports_from_wpi()
+    # NUL separator: a query can't match across two fields
+    PORT_SEARCH_INDEX = [(p, f"{p.id}\0{p.name}\0{p.country}".lower()) for p in PORTS.values()]
 
-    if GRAPH_PICKLE_PATH.exists():
+    if graph_cache_exists():
         GRAPH = load_graph()
     else:
         # Fallback build region if no cached graph exists
@@ -78,21 +215,28 @@ def init_app():
         GRAPH, PIRACY_LAYER, WEATHER_LAYER = build_grid_graph(lat_range, lon_range)
         save_graph(GRAPH)
 
+    # Nearest-node index for /route endpoints, built once here rather than on the first request
+    node_kdtree(GRAPH)
+    PORT_NODE = port_node_map(GRAPH, PORTS)
+
     if PIRACY_LAYER is None or WEATHER_LAYER is None:
         PIRACY_LAYER = load_piracy_zones()
         WEATHER_LAYER = load_weather_zones()
 
     # Geopolitics: load layer and annotate graph
     try:
-        geop_layer, _, _ = load_geopolitics_config()
-        GEOPOL_LAYER = geop_layer
+        GEOPOL_LAYER = load_geopolitics_config().layer
         apply_geopolitics_to_graph(GRAPH)
         print("[INFO] Geopolitics layer loaded and applied to graph.")
     except Exception as exc:
         print(f"[WARN] Could not load/apply geopolitics config: {exc}")
         GEOPOL_LAYER = None
 
-    # Live weather enrichment → build aggregated weather layer
+
+def refresh_live_weather():
+    """Live weather enrichment → aggregated weather layer (blocking HTTP; run off the event loop)."""
+    global WEATHER_LIVE_LAYER
+
     try:
         update_graph_weather(GRAPH)
         WEATHER_LIVE_LAYER = build_weather_risk_layer(GRAPH)
@@ -101,14 +245,39 @@ def init_app():
         print(f"[WARN] Could not update live weather on startup: {exc}")
 
 
-@app.on_event("startup")
-async def startup_event():
-    global TRAFFIC_LAYER, SAFETY_LAYER
+def reload_geopolitics() -> bool:
+    """
+    Pick up edits to the geopolitics GeoJSON: drop the cached config, re-annotate
+    the graph (which bumps risk_version, so cached routes stop matching) and
+    rebuild the layers that depend on it. Returns True if anything was reloaded.
+    """
+    global GEOPOL_LAYER, SAFETY_LAYER
 
-    # 1) Synchronous bootstrapping (ports, graph, static + live weather)
-    init_app()
+    if not invalidate_geopolitics_config():
+        return False
+    try:
+        GEOPOL_LAYER = load_geopolitics_config().layer
+        apply_geopolitics_to_graph(GRAPH)
+        SAFETY_LAYER = build_safety_layer_from_graph(GRAPH)
+    except Exception as exc:
+        print(f"[WARN] Could not reload geopolitics config: {exc}")
+        return False
+    refresh_layer_json()
+    print("[INFO] Geopolitics config changed; layer and graph refreshed.")
+    return True
+
+
+async def watch_geopolitics():
+    """Check the geopolitics GeoJSON every GEOPOLITICS_RELOAD_SEC and reload it when it changed."""
+    while True:
+        await asyncio.sleep(GEOPOLITICS_RELOAD_SEC)
+        await asyncio.to_thread(reload_geopolitics)
+
+
+async def refresh_traffic():
+    """AIS traffic update → per-node traffic_risk → aggregated traffic layer."""
+    global TRAFFIC_LAYER
 
-    # 2) AIS traffic update → per-node traffic_risk → aggregated traffic layer
     try:
         await update_graph_traffic_from_ais(
             GRAPH,
@@ -116,20 +285,49 @@ async def startup_event():
             AIS_LON_RANGE,
             duration_sec=60.0,  # explicit for readability
         )
-        TRAFFIC_LAYER = build_traffic_layer_from_graph(GRAPH)
+        TRAFFIC_LAYER = await asyncio.to_thread(build_traffic_layer_from_graph, GRAPH)
         print(f"[INFO] Traffic layer built. Features: {len(TRAFFIC_LAYER.features)}")
     except Exception as exc:
         print(f"[WARN] Could not update AIS traffic on startup: {exc}")
         TRAFFIC_LAYER = None
 
+
+@app.on_event("startup")
+async def startup_event():
+    global SAFETY_LAYER, GEOPOLITICS_WATCHER
+
+    # 1) Synchronous bootstrapping (ports, graph, static layers, geopolitics)
+    init_app()
+
+    # 2) The 60 s AIS sample and the live weather fetch are independent I/O
+    #    waits: run them side by side (weather in a worker thread)
+    await asyncio.gather(refresh_traffic(), asyncio.to_thread(refresh_live_weather))
+
+    # Both wrote node risks; re-snapshot once they are done so the
+    # routing arrays can't keep a view taken mid-update by the other
+    attach_node_risks(GRAPH)
+
     # 3) Aggregated safety heatmap (piracy+weather+depth+traffic+geopolitics)
     try:
-        SAFETY_LAYER = build_safety_layer_from_graph(GRAPH)
+        SAFETY_LAYER = await asyncio.to_thread(build_safety_layer_from_graph, GRAPH)
         print(f"[INFO] Safety layer built. Features: {len(SAFETY_LAYER.features)}")
     except Exception as exc:
         print(f"[WARN] Could not build safety layer: {exc}")
         SAFETY_LAYER = None
 
+    # 4) Pre-serialize every layer for /risk-layers
+    await asyncio.to_thread(refresh_layer_json)
+
+    # 5) From now on, follow edits to the geopolitics config
+    GEOPOLITICS_WATCHER = asyncio.create_task(watch_geopolitics())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if GEOPOLITICS_WATCHER is not None:
+        GEOPOLITICS_WATCHER.cancel()
+    ROUTE_POOL.shutdown(wait=False, cancel_futures=True)
+
 
 @app.get("/health", response_model=HealthResponse, tags=["System"])
 async def health():
@@ -148,12 +346,14 @@ async def list_ports(
     ports_list: List[Port] = list(PORTS.values())
     total = len(ports_list)
     slice_ports = ports_list[offset : offset + limit]
-    return PortsListResponse(
-        ports=slice_ports,
-        count=len(slice_ports),
-        total=total,
-        limit=limit,
-        offset=offset,
+    return model_response(
+        PortsListResponse(
+            ports=slice_ports,
+            count=len(slice_ports),
+            total=total,
+            limit=limit,
+            offset=offset,
+        )
     )
 
 
@@ -164,16 +364,12 @@ async def search_ports(
 ):
     q_lower = q.lower()
     results: List[Port] = []
-    for p in PORTS.values():
-        if (
-            q_lower in p.id.lower()
-            or q_lower in p.name.lower()
-            or q_lower in p.country.lower()
-        ):
+    for p, haystack in PORT_SEARCH_INDEX:
+        if q_lower in haystack:
             results.append(p)
-        if len(results) >= limit:
-            break
-    return PortsSearchResponse(ports=results)
+            if len(results) >= limit:
+                break
+    return model_response(PortsSearchResponse(ports=results))
 
 
 @app.get(
@@ -190,7 +386,7 @@ async def get_port(portId: str):
                 status="error",
                 error="PORT_NOT_FOUND",
                 message=f"Port with id '{portId}' not found",
-            ).dict(),
+            ).model_dump(),
         )
     return PORTS[portId]
 
@@ -209,11 +405,15 @@ async def route(request: RouteRequest):
                 status="error",
                 error="GRAPH_NOT_LOADED",
                 message="Routing graph is not loaded",
-            ).dict(),
+            ).model_dump(),
         )
     try:
-        result = compute_route(GRAPH, request, PORTS)
-        return result
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            ROUTE_POOL, partial(compute_route, GRAPH, request, PORTS, port_nodes=PORT_NODE)
+        )
+        # Serialized once, without FastAPI re-validating every segment against response_model
+        return model_response(result)
     except ValueError as ve:
         raise HTTPException(
             status_code=400,
@@ -221,7 +421,7 @@ async def route(request: RouteRequest):
                 status="error",
                 error="INVALID_REQUEST",
                 message=str(ve),
-            ).dict(),
+            ).model_dump(),
         )
     except Exception as e:
         raise HTTPException(
@@ -230,11 +430,19 @@ async def route(request: RouteRequest):
                 status="error",
                 error="ROUTING_ERROR",
                 message=str(e),
-            ).dict(),
+            ).model_dump(),
         )
 
 
-@app.get("/risk-layers", response_model=RiskLayersResponse, tags=["Risk"])
+@app.get(
+    "/risk-layers",
+    response_model=RiskLayersResponse,
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "One RiskLayer per line when NDJSON is accepted"},
+        400: {"model": ErrorResponse},
+    },
+    tags=["Risk"],
+)
 async def risk_layers(
     types: Optional[str] = Query(
         None,
@@ -244,7 +452,22 @@ async def risk_layers(
         None,
         description='Optional bounding box "minLon,minLat,maxLon,maxLat".',
     ),
+    accept: Optional[str] = Header(None, include_in_schema=False),
 ):
+    bbox_tuple = None
+    if bbox:
+        try:
+            bbox_tuple = parse_bbox(bbox)
+        except ValueError as ve:
+            raise HTTPException(
+                status_code=400,
+                detail=ErrorResponse(
+                    status="error",
+                    error="INVALID_BBOX",
+                    message=str(ve),
+                ).model_dump(),
+            )
+
     # Parse requested layer types (if any)
     type_list = None
     if types:
@@ -271,8 +494,19 @@ async def risk_layers(
     if SAFETY_LAYER and (type_list is None or "safety" in type_list):
         layers.append(SAFETY_LAYER)
 
-    # TODO: filter by bbox if provided
-    return RiskLayersResponse(layers=layers)
+    # Stream the cached per-layer JSON rather than re-validating and
+    # re-serializing every polygon on each request (same body as RiskLayersResponse).
+    # With a bbox, only features whose bounding box meets it are serialized,
+    # lazily: the sync iterator is drained in a worker thread, one layer at a time.
+    if bbox_tuple is None:
+        chunks = (layer_json(layer) for layer in layers)
+    else:
+        chunks = (dump_json(layer_in_bbox(layer, bbox_tuple)) for layer in layers)
+
+    # Clients that accept NDJSON get one layer per line and can render each as it arrives
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(iter_layers_ndjson(chunks), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(iter_layers_json(chunks), media_type="application/json")
 
 
 # ── Entrypoint (dev)
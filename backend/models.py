@@ -1,12 +1,12 @@
 # models.py
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class HealthResponse(BaseModel):
-    status: str = Field(example="ok")
-    graph_loaded: bool = Field(example=True)
-    version: str = Field(example="0.1.0")
+    status: str = Field(examples=["ok"])
+    graph_loaded: bool = Field(examples=[True])
+    version: str = Field(examples=["0.1.0"])
 
 
 class Port(BaseModel):
@@ -16,6 +16,9 @@ class Port(BaseModel):
     latitude: float
     longitude: float
 
+    # Ports are loaded once and shared by every request: read-only (and hashable)
+    model_config = ConfigDict(frozen=True)
+
 
 class PortsListResponse(BaseModel):
     ports: List[Port]
@@ -72,15 +75,14 @@ class RouteSummary(BaseModel):
 
 
 class RouteSegment(BaseModel):
-    from_: List[float] = Field(..., alias="from", min_items=2, max_items=2)
-    to: List[float] = Field(..., min_items=2, max_items=2)
+    from_: List[float] = Field(..., alias="from", min_length=2, max_length=2)
+    to: List[float] = Field(..., min_length=2, max_length=2)
     distanceNm: float
     weatherRisk: float
     piracyRisk: float
     depthPenalty: float
 
-    class Config:
-        allow_population_by_field_name = True
+    model_config = ConfigDict(validate_by_name=True)
 
 
 class RoutePath(BaseModel):
@@ -113,5 +115,22 @@ class RiskLayer(BaseModel):
     features: List[RiskFeature]
 
 
+def construct_trusted(model_cls, **values):
+    """
+    Build a model from values that are already the right plain Python types,
+    skipping validation (layer builders emit thousands of features).
+    """
+    return model_cls.model_construct(**values)
+
+
+def dump_json(model) -> bytes:
+    """
+    Serialize a model straight to JSON bytes with pydantic-core's serializer,
+    without an intermediate dict. Uses field aliases (RouteSegment's "from"),
+    as FastAPI's own response serialization does.
+    """
+    return model.model_dump_json(by_alias=True).encode()
+
+
 class RiskLayersResponse(BaseModel):
     layers: List[RiskLayer]
@@ -6,20 +6,19 @@ raw_path = Path("data/UpdatedPub150.csv")
 out_path = Path("data/world_port_index_sample.csv")
 
 
-df = pd.read_csv(raw_path)
+columns = {
+    "World Port Index Number": "port_id",
+    "Main Port Name": "port_name",
+    "Country Code": "country",
+    "Latitude": "latitude",
+    "Longitude": "longitude",
+}
 
 print("Original columns:")
-print(list(df.columns))
-
-df_out = df.rename(
-    columns={
-        "World Port Index Number": "port_id",
-        "Main Port Name": "port_name",
-        "Country Code": "country",
-        "Latitude": "latitude",
-        "Longitude": "longitude",
-    }
-)[["port_id", "port_name", "country", "latitude", "longitude"]]
+print(list(pd.read_csv(raw_path, nrows=0).columns))
+
+# Only parse the columns we keep
+df_out = pd.read_csv(raw_path, usecols=list(columns)).rename(columns=columns)[list(columns.values())]
 
 # Convert to numeric 
 df_out["latitude"] = pd.to_numeric(df_out["latitude"], errors="coerce")
@@ -32,12 +31,14 @@ df_out = df_out.dropna(subset=["latitude", "longitude"])
 lat_min, lat_max = -10.0, 35.0
 lon_min, lon_max = 30.0, 65.0
 
-df_out = df_out[
-    (df_out["latitude"] >= lat_min)
-    & (df_out["latitude"] <= lat_max)
-    & (df_out["longitude"] >= lon_min)
-    & (df_out["longitude"] <= lon_max)
-]
+# One boolean mask, narrowed in place (no temporary per bound)
+lat = df_out["latitude"].to_numpy()
+lon = df_out["longitude"].to_numpy()
+in_region = lat >= lat_min
+in_region &= lat <= lat_max
+in_region &= lon >= lon_min
+in_region &= lon <= lon_max
+df_out = df_out[in_region]
 
 out_path.parent.mkdir(parents=True, exist_ok=True)
 df_out.to_csv(out_path, index=False)
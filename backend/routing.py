@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Dict, Tuple, List
+import math
+import threading
 
 import networkx as nx
-from haversine import haversine
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra
+except ImportError:  # optional: routing falls back to networkx with a Python weight callback
+    csr_matrix = dijkstra = None
 
 # Note: LAMBDA_* constants are currently unused; kept for future tuning via config.
 from backend.config import LAMBDA_PIRACY, LAMBDA_WEATHER, LAMBDA_DEPTH, LAMBDA_TRAFFIC, LAMBDA_GEO
+from backend.config import EARTH_RADIUS_NM, ROUTE_CACHE_SIZE, ROUTE_RESPONSE_CACHE_SIZE
 from backend.models import (
     RouteRequest,
     RouteResponse,
@@ -15,27 +25,90 @@ from backend.models import (
     RouteSegment,
     RouteExplanation,
     Port,
+    construct_trusted,
+)
+from backend.geopolitics import infer_vessel_iso3_from_origin_country, get_zone_metadata, target_flags_matrix
+from backend.graph_builder import (
+    lat_lon_of,
+    node_coords,
+    node_risks,
+    node_risk_version,
+    node_kdtree,
+    unit_vectors,
+    haversine_nm,
+    edge_arrays,
 )
-from backend.geopolitics import infer_vessel_iso3_from_origin_country, get_zone_metadata
 
 
-def find_closest_node(G: nx.Graph, lat: float, lon: float) -> str:
-    """Return the node id closest (haversine) to (lat, lon)."""
+def _haversine_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in nautical miles between two points given in degrees."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    s_lat = math.sin((lat2 - lat1) * 0.5)
+    s_lon = math.sin((lon2 - lon1) * 0.5)
+    return 2.0 * EARTH_RADIUS_NM * math.asin(math.sqrt(s_lat * s_lat + math.cos(lat1) * math.cos(lat2) * s_lon * s_lon))
+
+
+# Nearest neighbours fetched from the KD-tree; covers exact ties between grid nodes
+_CLOSEST_CANDIDATES = 8
+
+
+def find_closest_node(G: nx.Graph, lat: float, lon: float):
+    """
+    Return the node id closest (haversine) to (lat, lon), the first one in
+    graph order on ties. A KD-tree (node_kdtree) or, without scipy, one
+    vectorized distance pass narrows the search to a few candidates, which
+    are then compared with the exact scalar haversine.
+    """
+    node_order, coords = node_coords(G)
+    if not node_order:
+        return None
+
+    tree = node_kdtree(G)
+    if tree is not None:
+        k = min(_CLOSEST_CANDIDATES, len(node_order))
+        _, candidates = tree.query(unit_vectors([lat], [lon])[0], k=k)
+    else:
+        dist = haversine_nm(lat, lon, coords[:, 0], coords[:, 1])
+        candidates = np.flatnonzero(dist <= dist.min() * (1.0 + 1e-9) + 1e-9)
+    return _closest_candidate(node_order, coords, lat, lon, candidates)
+
+
+def find_closest_nodes(G: nx.Graph, lats, lons) -> List:
+    """
+    find_closest_node for many points at once: one KD-tree query over all of
+    them, then the same exact tie-breaking per point.
+    """
+    node_order, coords = node_coords(G)
+    tree = node_kdtree(G)
+    if not node_order or tree is None or not len(lats):
+        return [find_closest_node(G, lat, lon) for lat, lon in zip(lats, lons)]
+
+    k = min(_CLOSEST_CANDIDATES, len(node_order))
+    _, candidates = tree.query(unit_vectors(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)), k=k)
+    candidates = candidates.reshape(len(lats), -1)
+    return [
+        _closest_candidate(node_order, coords, lat, lon, row)
+        for lat, lon, row in zip(lats, lons, candidates)
+    ]
+
+
+def _closest_candidate(node_order, coords: np.ndarray, lat: float, lon: float, candidates):
+    """Candidate position nearest to (lat, lon) by exact scalar haversine, lowest position on ties."""
+    candidates = np.sort(np.atleast_1d(candidates))
     best_node = None
     best_dist = float("inf")
-    for node_id, data in G.nodes(data=True):
-        n_lat, n_lon = data["lat"], data["lon"]
-        d = haversine((lat, lon), (n_lat, n_lon))
+    for i in candidates.tolist():
+        n_lat, n_lon = coords[i].tolist()
+        d = _haversine_nm(lat, lon, n_lat, n_lon)
         if d < best_dist:
             best_dist = d
-            best_node = node_id
+            best_node = node_order[i]
     return best_node
 
 
-def get_coordinates_of_node(G: nx.Graph, node_id: str) -> Tuple[float, float]:
+def get_coordinates_of_node(G: nx.Graph, node_id) -> Tuple[float, float]:
     """Convenience getter for node coordinates."""
-    data = G.nodes[node_id]
-    return data["lat"], data["lon"]
+    return lat_lon_of(G, node_id)
 
 
 def _resolve_origin_or_destination(
@@ -54,6 +127,25 @@ def _resolve_origin_or_destination(
         return od.latitude, od.longitude
 
 
+def port_node_map(G: nx.Graph, ports: Dict[str, Port]) -> Dict[str, object]:
+    """Nearest graph node of every port, by port id (ports don't move: build once per graph)."""
+    port_ids = list(ports)
+    nodes = find_closest_nodes(
+        G,
+        [ports[port_id].latitude for port_id in port_ids],
+        [ports[port_id].longitude for port_id in port_ids],
+    )
+    return dict(zip(port_ids, nodes))
+
+
+def _endpoint_node(G: nx.Graph, od, ports: Dict[str, Port], port_nodes: Dict[str, object] | None):
+    """Graph node for an origin/destination: precomputed for ports when available, else nearest."""
+    if port_nodes is not None and od.type == "port" and od.portId in port_nodes:
+        return port_nodes[od.portId]
+    lat, lon = _resolve_origin_or_destination(od, ports)
+    return find_closest_node(G, lat, lon)
+
+
 def _infer_vessel_iso3(route_request: RouteRequest, ports: Dict[str, Port]) -> str | None:
     """
     Infer vessel nationality (ISO3) from origin port's country.
@@ -69,62 +161,62 @@ def _infer_vessel_iso3(route_request: RouteRequest, ports: Dict[str, Port]) -> s
     return infer_vessel_iso3_from_origin_country(origin_port.country)
 
 
-def build_weight_function(mode: str, G: nx.Graph, vessel_iso3: str | None):
+def _node_risk_terms(G: nx.Graph, vessel_iso3: str | None):
     """
-    Build edge weight function for routing.
-    Mode sets scalar trade-offs between distance and risk terms.
+    (node_index, piracy, weather, depth, traffic, geo) for the routing hot
+    loops: position per node id plus one float64 array per risk term, in
+    node_coords order. geo is the base geopolitical risk plus the targeted
+    extra for vessel_iso3, if any.
     """
+    node_index, risks = node_risks(G)
+    geo = risks["geo_base_risk"]
+    if vessel_iso3 is not None:
+        iso3_index, flags_matrix = target_flags_matrix(G)
+        column = iso3_index.get(vessel_iso3)
+        if column is not None:
+            geo = geo + flags_matrix[:, column].astype(np.float64)
+    return (
+        node_index,
+        risks["piracy_risk"],
+        risks["weather_risk"],
+        risks["depth_penalty"],
+        risks["traffic_risk"],
+        geo,
+    )
+
 
+def _mode_lambdas(mode: str) -> Tuple[float, float, float, float, float]:
+    """(piracy, weather, depth, traffic, geo) weights of the edge cost for a routing mode."""
     if mode == "fast":
-        lambda_p = 0.0
-        lambda_w = 0.0
-        lambda_d = 1.0
-        lambda_t = 0.5
-        lambda_geo = 0.0
+        return 0.0, 0.0, 1.0, 0.5, 0.0
     elif mode == "safe":
-        lambda_p = 50.0
-        lambda_w = 6.0
-        lambda_d = 30.0
-        lambda_t = 10.0
-        lambda_geo = 50.0
+        return 50.0, 6.0, 30.0, 10.0, 50.0
     else:  # balanced
-        lambda_p = 10.0
-        lambda_w = 3.0
-        lambda_d = 10.0
-        lambda_t = 4.0
-        lambda_geo = 4.0
-
-    def geopolitical_node_penalty(node_id: str) -> float:
-        """Base geopolitics + targeted penalty for vessel ISO3."""
-        node_data = G.nodes[node_id]
-        base = float(node_data.get("geo_base_risk", 0.0))
-        if vessel_iso3 is None:
-            return base
-        extras = node_data.get("geo_target_flags", {}) or {}
-        extra = float(extras.get(vessel_iso3, 0.0))
-        return base + extra
+        return 10.0, 3.0, 10.0, 4.0, 4.0
+
+
+def build_weight_function(mode: str, G: nx.Graph, vessel_iso3: str | None):
+    """
+    Build edge weight function for routing.
+    Mode sets scalar trade-offs between distance and risk terms.
+    """
+
+    lambda_p, lambda_w, lambda_d, lambda_t, lambda_geo = _mode_lambdas(mode)
+
+    node_index, *terms = _node_risk_terms(G, vessel_iso3)
+    piracy, weather, depth, traffic, geo = (term.tolist() for term in terms)
 
     def weight(u: str, v: str, attrs: dict) -> float:
         """Edge cost = distance + weighted average risks of endpoints."""
         dist_nm = attrs.get("distance_nm", 1.0)
+        iu = node_index[u]
+        iv = node_index[v]
 
-        piracy_u = G.nodes[u]["piracy_risk"]
-        piracy_v = G.nodes[v]["piracy_risk"]
-        weather_u = G.nodes[u]["weather_risk"]
-        weather_v = G.nodes[v]["weather_risk"]
-        depth_u = G.nodes[u]["depth_penalty"]
-        depth_v = G.nodes[v]["depth_penalty"]
-        traffic_u = G.nodes[u].get("traffic_risk", 0)
-        traffic_v = G.nodes[v].get("traffic_risk", 0)
-
-        geo_u = geopolitical_node_penalty(u)
-        geo_v = geopolitical_node_penalty(v)
-
-        piracy_avg = (piracy_u + piracy_v) / 2.0
-        weather_avg = (weather_u + weather_v) / 2.0
-        depth_avg = (depth_u + depth_v) / 2.0
-        traffic_avg = (traffic_u + traffic_v) / 2.0
-        geo_avg = (geo_u + geo_v) / 2.0
+        piracy_avg = (piracy[iu] + piracy[iv]) / 2.0
+        weather_avg = (weather[iu] + weather[iv]) / 2.0
+        depth_avg = (depth[iu] + depth[iv]) / 2.0
+        traffic_avg = (traffic[iu] + traffic[iv]) / 2.0
+        geo_avg = (geo[iu] + geo[iv]) / 2.0
 
         cost = (
             dist_nm
@@ -139,6 +231,183 @@ def build_weight_function(mode: str, G: nx.Graph, vessel_iso3: str | None):
     return weight
 
 
+def edge_costs(mode: str, G: nx.Graph, vessel_iso3: str | None) -> np.ndarray:
+    """
+    Vectorized build_weight_function: the cost of every edge of edge_arrays(G),
+    computed with the same operations in the same order, so values match the
+    scalar callback bit for bit.
+    """
+    lambda_p, lambda_w, lambda_d, lambda_t, lambda_geo = _mode_lambdas(mode)
+    _node_index, piracy, weather, depth, traffic, geo = _node_risk_terms(G, vessel_iso3)
+    edge_u, edge_v, dist_nm = edge_arrays(G)
+
+    piracy_avg = (piracy[edge_u] + piracy[edge_v]) / 2.0
+    weather_avg = (weather[edge_u] + weather[edge_v]) / 2.0
+    depth_avg = (depth[edge_u] + depth[edge_v]) / 2.0
+    traffic_avg = (traffic[edge_u] + traffic[edge_v]) / 2.0
+    geo_avg = (geo[edge_u] + geo[edge_v]) / 2.0
+
+    return (
+        dist_nm
+        + lambda_p * piracy_avg
+        + lambda_w * weather_avg
+        + lambda_d * depth_avg
+        + lambda_t * traffic_avg
+        + lambda_geo * geo_avg
+    )
+
+
+def precomputed_weight_function(mode: str, G: nx.Graph, vessel_iso3: str | None):
+    """
+    build_weight_function with every edge's cost computed up front by
+    edge_costs: the callback only looks its edge up. Edge attribute dicts are
+    shared by both directions of an undirected edge, so they identify it.
+    """
+    costs = edge_costs(mode, G, vessel_iso3).tolist()
+    cost_of = {id(attrs): cost for (_u, _v, attrs), cost in zip(G.edges(data=True), costs)}
+
+    def weight(u, v, attrs: dict) -> float:
+        return cost_of[id(attrs)]
+
+    return weight
+
+
+def _csr_layout(G: nx.Graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sparsity pattern of G's (symmetric) adjacency matrix in node_coords order:
+    (indptr, indices, edge_of), where edge_of maps each stored entry to its edge
+    in edge_arrays(G). Fixed for a given topology, so it is cached on the graph
+    and each route only gathers fresh costs into it.
+    """
+    edge_u, edge_v, _dist_nm = edge_arrays(G)
+    cached = G.graph.get("route_csr")
+    if cached is None or cached[0] is not edge_u:
+        n_nodes = len(node_coords(G)[0])
+        n_edges = len(edge_u)
+        rows = np.concatenate([edge_u, edge_v])
+        cols = np.concatenate([edge_v, edge_u])
+        edge_of = np.concatenate([np.arange(n_edges), np.arange(n_edges)])
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_nodes), out=indptr[1:])
+        cached = (edge_u, (indptr, cols[order], edge_of[order]))
+        G.graph["route_csr"] = cached
+    return cached[1]
+
+
+# (mode, vessel_iso3) combinations whose edge weights are kept per risk version
+_ROUTE_WEIGHTS_CACHE_SIZE = 16
+# Guards G.graph["route_weights"]: /route searches run on several ROUTE_POOL threads
+_ROUTE_WEIGHTS_LOCK = threading.Lock()
+
+
+def _route_weights(G: nx.Graph, mode: str, vessel_iso3: str | None):
+    """
+    Edge weights for a (mode, vessel_iso3) search: the CSR cost matrix for
+    scipy's dijkstra, or the build_weight_function callback without scipy.
+    Built once per combination and reused until the risk arrays are refreshed
+    (risk_version) or the topology changes, so a /route call only runs the search.
+    Thread-safe; weights are built outside the lock, so two threads missing
+    the same key at once may both build it (the results are identical).
+    """
+    node_order, _coords = node_coords(G)
+    version = node_risk_version(G)
+    key = (mode, vessel_iso3)
+    with _ROUTE_WEIGHTS_LOCK:
+        cached = G.graph.get("route_weights")
+        if cached is None or cached[0] is not node_order or cached[1] != version:
+            cached = (node_order, version, {})
+            G.graph["route_weights"] = cached
+        weights = cached[2]
+        weight = weights.get(key)
+    if weight is not None:
+        return weight
+
+    if dijkstra is None:
+        weight = precomputed_weight_function(mode, G, vessel_iso3)
+    else:
+        indptr, indices, edge_of = _csr_layout(G)
+        costs = edge_costs(mode, G, vessel_iso3)
+        weight = csr_matrix((costs[edge_of], indices, indptr), shape=(len(node_order), len(node_order)))
+
+    with _ROUTE_WEIGHTS_LOCK:
+        if key not in weights and len(weights) >= _ROUTE_WEIGHTS_CACHE_SIZE:
+            weights.pop(next(iter(weights)))
+        weights[key] = weight
+    return weight
+
+
+def shortest_path_nodes(G: nx.Graph, origin_node, dest_node, mode: str, vessel_iso3: str | None) -> List:
+    """
+    Minimum-cost path from origin_node to dest_node under the mode's edge cost.
+    Runs scipy's C Dijkstra over a CSR matrix of precomputed edge costs; without
+    scipy, networkx's bidirectional Dijkstra with precomputed_weight_function.
+    Ties between equal-cost paths may resolve differently between the two.
+    """
+    if origin_node == dest_node:
+        # Zero-length route: nothing to search
+        return [origin_node]
+
+    if dijkstra is None:
+        weight_fn = _route_weights(G, mode, vessel_iso3)
+        _cost, path = nx.bidirectional_dijkstra(G, origin_node, dest_node, weight=weight_fn)
+        return path
+
+    node_order, _coords = node_coords(G)
+    node_index, _risks = node_risks(G)
+    source = node_index[origin_node]
+    target = node_index[dest_node]
+
+    graph = _route_weights(G, mode, vessel_iso3)
+    _dist, predecessors = dijkstra(graph, indices=source, return_predecessors=True)
+    return _path_from_predecessors(node_order, predecessors, source, target, origin_node, dest_node)
+
+
+def _path_from_predecessors(node_order, predecessors: np.ndarray, source: int, target: int, origin_node, dest_node) -> List:
+    """Walk scipy's predecessor array back from target to source, as node ids in path order."""
+    path = [target]
+    while path[-1] != source:
+        prev = predecessors[path[-1]]
+        if prev < 0:
+            raise nx.NetworkXNoPath(f"Node {dest_node} not reachable from {origin_node}")
+        path.append(int(prev))
+    return [node_order[i] for i in reversed(path)]
+
+
+def shortest_paths_from(G: nx.Graph, origin_node, dest_nodes, mode: str, vessel_iso3: str | None) -> Dict:
+    """
+    shortest_path_nodes from one origin to each of dest_nodes, by destination.
+    With scipy a single Dijkstra run serves every destination (the paths are
+    the ones shortest_path_nodes would return); without it, one search each.
+    """
+    if dijkstra is None:
+        return {
+            dest_node: shortest_path_nodes(G, origin_node, dest_node, mode, vessel_iso3)
+            for dest_node in dest_nodes
+        }
+
+    node_order, _coords = node_coords(G)
+    node_index, _risks = node_risks(G)
+    source = node_index[origin_node]
+
+    graph = _route_weights(G, mode, vessel_iso3)
+    _dist, predecessors = dijkstra(graph, indices=source, return_predecessors=True)
+    return {
+        dest_node: _path_from_predecessors(node_order, predecessors, source, node_index[dest_node], origin_node, dest_node)
+        for dest_node in dest_nodes
+    }
+
+
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def _cached_path_nodes(G: nx.Graph, origin_node, dest_node, mode: str, vessel_iso3: str | None, risk_version: int):
+    """
+    Memoized shortest_path_nodes, as a tuple. risk_version (see
+    attach_node_risks) is only part of the key: weather/traffic/geopolitics
+    refreshes bump it, so paths computed on older risks are never reused.
+    """
+    return tuple(shortest_path_nodes(G, origin_node, dest_node, mode, vessel_iso3))
+
+
 def build_explanation(summary: RouteSummary, mode: str, route_alerts: List[str] | None = None) -> RouteExplanation:
     """Produce human-readable rationale + trade-offs from the summary."""
     high_level: List[str] = []
@@ -209,114 +478,130 @@ def compute_route(
     route_request: RouteRequest,
     ports: Dict[str, Port],
     default_speed_knots: float = 20.0,
+    port_nodes: Dict[str, object] | None = None,
 ) -> RouteResponse:
-    """Compute path, summarize risks, build explanation and response payload."""
+    """
+    Compute path, summarize risks, build explanation and response payload.
+    port_nodes (see port_node_map) maps port ids to their nearest graph
+    node, so port endpoints skip the nearest-node lookup. Responses are
+    memoized (see _cached_route_response) and shared between identical
+    requests; callers must not mutate them.
+    """
 
     # Resolve user-specified endpoints → nearest graph nodes
-    origin_lat, origin_lon = _resolve_origin_or_destination(
-        route_request.origin, ports
-    )
-    dest_lat, dest_lon = _resolve_origin_or_destination(
-        route_request.destination, ports
-    )
-
-    origin_node = find_closest_node(G, origin_lat, origin_lon)
-    dest_node = find_closest_node(G, dest_lat, dest_lon)
+    origin_node = _endpoint_node(G, route_request.origin, ports, port_nodes)
+    dest_node = _endpoint_node(G, route_request.destination, ports, port_nodes)
 
     # Vessel ISO3 may alter geopolitical penalties
     vessel_iso3 = _infer_vessel_iso3(route_request, ports)
-    weight_fn = build_weight_function(route_request.mode, G, vessel_iso3)
 
-    # Shortest path under custom weight
-    path_nodes: List[str] = nx.shortest_path(G, origin_node, dest_node, weight=weight_fn)
-
-    def node_geopolitical_penalty(node_id: str) -> float:
-        """Same as above but local to this scope."""
-        node_data = G.nodes[node_id]
-        base = float(node_data.get("geo_base_risk", 0.0))
-        if vessel_iso3 is None:
-            return base
-        extras = node_data.get("geo_target_flags", {}) or {}
-        extra = float(extras.get(vessel_iso3, 0.0))
-        return base + extra
+    origin_port_id = route_request.origin.portId if route_request.origin.type == "port" else None
+    dest_port_id = (
+        route_request.destination.portId if route_request.destination.type == "port" else None
+    )
 
-    coordinates: List[List[float]] = []
-    segments: List[RouteSegment] = []
+    return _cached_route_response(
+        G,
+        origin_node,
+        dest_node,
+        origin_port_id,
+        dest_port_id,
+        route_request.mode,
+        vessel_iso3,
+        default_speed_knots,
+        node_risk_version(G),
+    )
 
-    total_distance_nm = 0.0
 
-    # Distance-weighted risk accumulators
-    sum_piracy_len = 0.0
-    sum_weather_len = 0.0
-    sum_depth_len = 0.0
-    sum_traffic_len = 0.0
-    sum_geo_len = 0.0
+@lru_cache(maxsize=ROUTE_RESPONSE_CACHE_SIZE)
+def _cached_route_response(
+    G: nx.Graph,
+    origin_node,
+    dest_node,
+    origin_port_id: str | None,
+    dest_port_id: str | None,
+    mode: str,
+    vessel_iso3: str | None,
+    default_speed_knots: float,
+    risk_version: int,
+) -> RouteResponse:
+    """
+    The RouteResponse for resolved endpoints, memoized like _cached_path_nodes:
+    requests that snap to the same nodes with the same ports, mode and vessel
+    flag get the same response until the risk arrays are refreshed.
+    """
+    # Shortest path under the mode's edge cost
+    path_nodes = _cached_path_nodes(G, origin_node, dest_node, mode, vessel_iso3, risk_version)
+    return _build_route_response(
+        G, path_nodes, origin_port_id, dest_port_id, mode, vessel_iso3, default_speed_knots
+    )
 
-    visited_geo_zones = set()
 
-    last_lat, last_lon = None, None
+def _build_route_response(
+    G: nx.Graph,
+    path_nodes,
+    origin_port_id: str | None,
+    dest_port_id: str | None,
+    mode: str,
+    vessel_iso3: str | None,
+    default_speed_knots: float,
+) -> RouteResponse:
+    """Summarize risks along path_nodes and build the explanation and response payload."""
+    node_index, *terms = _node_risk_terms(G, vessel_iso3)
+    path_nodes: List[str] = list(path_nodes)
 
-    # Walk the path and build segments + accumulate risks
-    for idx, node_id in enumerate(path_nodes):
-        lat, lon = get_coordinates_of_node(G, node_id)
-        coordinates.append([lat, lon])
+    # Risk terms and coordinates of the path's nodes only, in path order
+    path_pos = np.fromiter((node_index[node_id] for node_id in path_nodes), dtype=np.intp, count=len(path_nodes))
+    path_terms = np.stack([term[path_pos] for term in terms])  # rows: piracy, weather, depth, traffic, geo
+    coords = node_coords(G)[1][path_pos]
+    coordinates: List[List[float]] = coords.tolist()
 
-        node_data = G.nodes[node_id]
-        for zid in node_data.get("geo_zones", []) or []:
+    visited_geo_zones = set()
+    nodes = G.nodes
+    for node_id in path_nodes:
+        for zid in nodes[node_id].get("geo_zones", []) or []:
             visited_geo_zones.add(str(zid))
 
-        if idx > 0:
-            prev_id = path_nodes[idx - 1]
-            prev_data = G.nodes[prev_id]
-
-            segment_distance_nm = G[prev_id][node_id]["distance_nm"]
-
-            piracy_avg = (
-                prev_data["piracy_risk"] + node_data["piracy_risk"]
-            ) / 2.0
-            weather_avg = (
-                prev_data["weather_risk"] + node_data["weather_risk"]
-            ) / 2.0
-            depth_avg = (
-                prev_data["depth_penalty"] + node_data["depth_penalty"]
-            ) / 2.0
-            traffic_avg = (
-                prev_data.get("traffic_risk", 0) + node_data.get("traffic_risk", 0)
-            ) / 2.0
-
-            geo_prev = node_geopolitical_penalty(prev_id)
-            geo_curr = node_geopolitical_penalty(node_id)
-            geo_avg = (geo_prev + geo_curr) / 2.0
-
-            total_distance_nm += segment_distance_nm
-
-            sum_piracy_len += piracy_avg * segment_distance_nm
-            sum_weather_len += weather_avg * segment_distance_nm
-            sum_depth_len += depth_avg * segment_distance_nm
-            sum_traffic_len += traffic_avg * segment_distance_nm
-            sum_geo_len += geo_avg * segment_distance_nm
-
-            segment = RouteSegment(
-                **{
-                    "from": [last_lat, last_lon],
-                    "to": [lat, lon],
-                    "distanceNm": segment_distance_nm,
-                    "weatherRisk": weather_avg,
-                    "piracyRisk": piracy_avg,
-                    "depthPenalty": depth_avg,
-                }
-            )
-            segments.append(segment)
-
-        last_lat, last_lon = lat, lon
+    # Per-segment values: edge length and the mean of each term over its two ends
+    adj = G.adj
+    seg_dist = np.fromiter(
+        (adj[u][v]["distance_nm"] for u, v in zip(path_nodes, path_nodes[1:])),
+        dtype=np.float64,
+        count=max(len(path_nodes) - 1, 0),
+    )
+    # One pass over all five rows at once
+    seg_avgs = (path_terms[:, :-1] + path_terms[:, 1:]) / 2.0
+    piracy_avg, weather_avg, depth_avg, _traffic_avg, _geo_avg = seg_avgs
+
+    segments: List[RouteSegment] = [
+        # Values are already plain floats / [lat, lon] lists of the right shape
+        construct_trusted(
+            RouteSegment,
+            **{
+                "from": start,
+                "to": end,
+                "distanceNm": dist,
+                "weatherRisk": w,
+                "piracyRisk": p,
+                "depthPenalty": d,
+            },
+        )
+        for start, end, dist, w, p, d in zip(
+            coordinates,
+            coordinates[1:],
+            seg_dist.tolist(),
+            weather_avg.tolist(),
+            piracy_avg.tolist(),
+            depth_avg.tolist(),
+        )
+    ]
 
-    # Distance-weighted averages
+    # Distance-weighted averages (cumsum: same left-to-right summation order as a loop)
+    total_distance_nm = float(np.cumsum(seg_dist)[-1]) if len(seg_dist) else 0.0
     if total_distance_nm > 0:
-        avg_piracy = sum_piracy_len / total_distance_nm
-        avg_weather = sum_weather_len / total_distance_nm
-        avg_depth = sum_depth_len / total_distance_nm
-        avg_traffic = sum_traffic_len / total_distance_nm
-        avg_geo = sum_geo_len / total_distance_nm
+        avg_piracy, avg_weather, avg_depth, avg_traffic, avg_geo = (
+            np.cumsum(seg_avgs * seg_dist, axis=1)[:, -1] / total_distance_nm
+        ).tolist()
     else:
         avg_piracy = avg_weather = avg_depth = avg_traffic = avg_geo = 0.0
 
@@ -324,15 +609,10 @@ def compute_route(
         total_distance_nm / default_speed_knots if default_speed_knots > 0 else 0.0
     )
 
-    origin_port_id = route_request.origin.portId if route_request.origin.type == "port" else None
-    dest_port_id = (
-        route_request.destination.portId if route_request.destination.type == "port" else None
-    )
-
     summary = RouteSummary(
         originPortId=origin_port_id,
         destinationPortId=dest_port_id,
-        mode=route_request.mode,
+        mode=mode,
         totalDistanceNm=total_distance_nm,
         estimatedDurationHours=estimated_duration_hours,
         totalWeatherRisk=avg_weather,
@@ -345,10 +625,10 @@ def compute_route(
     # Build route alerts from visited geopolitical zones
     route_alerts: List[str] = []
     if visited_geo_zones:
+        # Metadata keys are already sorted: walk them instead of sorting the visited ids
         meta = get_zone_metadata()
-        for zid in sorted(visited_geo_zones):
-            m = meta.get(zid)
-            if not m:
+        for zid, m in meta.items():
+            if zid not in visited_geo_zones or not m:
                 continue
             name = m.get("name") or zid
             notes = m.get("notes", "").strip()
@@ -361,9 +641,11 @@ def compute_route(
 
             route_alerts.append(alert_text)
 
-    explanation = build_explanation(summary, route_request.mode, route_alerts)
+    explanation = build_explanation(summary, mode, route_alerts)
 
-    path = RoutePath(
+    # coordinates/segments are already plain [lat, lon] lists and built segments
+    path = construct_trusted(
+        RoutePath,
         coordinates=coordinates,
         segments=segments,
     )
@@ -375,3 +657,76 @@ def compute_route(
         explanation=explanation,
     )
     return response
+
+
+def compute_routes(
+    G: nx.Graph,
+    route_requests: List[RouteRequest],
+    ports: Dict[str, Port],
+    default_speed_knots: float = 20.0,
+    port_nodes: Dict[str, object] | None = None,
+) -> List[RouteResponse]:
+    """
+    compute_route for many requests at once (fleet fan-out, what-if runs),
+    responses in request order. Coordinate endpoints are snapped with a single
+    KD-tree query, edge weights are shared per (mode, vessel flag) through
+    _route_weights, and requests leaving the same node under the same mode and
+    flag share one Dijkstra run. The first unroutable request raises, as in
+    compute_route.
+    """
+    # Resolve every endpoint: ports through port_nodes, the rest in one batch
+    endpoints = [od for request in route_requests for od in (request.origin, request.destination)]
+    nodes: List[object] = [None] * len(endpoints)
+    pending: List[int] = []
+    lats: List[float] = []
+    lons: List[float] = []
+    for i, od in enumerate(endpoints):
+        if port_nodes is not None and od.type == "port" and od.portId in port_nodes:
+            nodes[i] = port_nodes[od.portId]
+            continue
+        lat, lon = _resolve_origin_or_destination(od, ports)
+        pending.append(i)
+        lats.append(lat)
+        lons.append(lon)
+    for i, node in zip(pending, find_closest_nodes(G, lats, lons)):
+        nodes[i] = node
+
+    risk_version = node_risk_version(G)
+    plans = []
+    searches: Dict[Tuple, set] = {}
+    for k, request in enumerate(route_requests):
+        origin_node, dest_node = nodes[2 * k], nodes[2 * k + 1]
+        vessel_iso3 = _infer_vessel_iso3(request, ports)
+        origin_port_id = request.origin.portId if request.origin.type == "port" else None
+        dest_port_id = request.destination.portId if request.destination.type == "port" else None
+        plans.append((origin_node, dest_node, origin_port_id, dest_port_id, request.mode, vessel_iso3))
+        searches.setdefault((origin_node, request.mode, vessel_iso3), set()).add(dest_node)
+
+    # One search per origin that fans out to several destinations
+    paths: Dict[Tuple, Dict] = {
+        (origin_node, mode, vessel_iso3): shortest_paths_from(G, origin_node, dest_nodes, mode, vessel_iso3)
+        for (origin_node, mode, vessel_iso3), dest_nodes in searches.items()
+        if len(dest_nodes) > 1
+    }
+
+    responses: List[RouteResponse] = []
+    for origin_node, dest_node, origin_port_id, dest_port_id, mode, vessel_iso3 in plans:
+        shared = paths.get((origin_node, mode, vessel_iso3))
+        if shared is None:
+            response = _cached_route_response(
+                G,
+                origin_node,
+                dest_node,
+                origin_port_id,
+                dest_port_id,
+                mode,
+                vessel_iso3,
+                default_speed_knots,
+                risk_version,
+            )
+        else:
+            response = _build_route_response(
+                G, shared[dest_node], origin_port_id, dest_port_id, mode, vessel_iso3, default_speed_knots
+            )
+        responses.append(response)
+    return responses
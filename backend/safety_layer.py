@@ -1,11 +1,13 @@
 # backend/safety_layer.py
 from __future__ import annotations
 
-from typing import Dict, Tuple, List
-import math
+from typing import Tuple, List
 
-from backend.models import RiskLayer, RiskFeature
+import numpy as np
+
+from backend.models import RiskLayer, RiskFeature, construct_trusted
 from backend.config import GRID_LAT_STEP, GRID_LON_STEP
+from backend.graph_builder import NODE_RISK_ATTRS, node_coords, node_risks
 
 
 def _cell_for_latlon(lat: float, lon: float) -> Tuple[float, float]:
@@ -18,9 +20,19 @@ def _cell_for_latlon(lat: float, lon: float) -> Tuple[float, float]:
     return cell_lat, cell_lon
 
 
+def _cell_rects(cell_lat: np.ndarray, cell_lon: np.ndarray) -> List[List[List[float]]]:
+    """Closed [lat, lon] rectangle of each grid cell centre, built in NumPy."""
+    half_lat = GRID_LAT_STEP / 2.0
+    half_lon = GRID_LON_STEP / 2.0
+    lat_min, lat_max = cell_lat - half_lat, cell_lat + half_lat
+    lon_min, lon_max = cell_lon - half_lon, cell_lon + half_lon
+    corners = [(lat_min, lon_min), (lat_min, lon_max), (lat_max, lon_max), (lat_max, lon_min), (lat_min, lon_min)]
+    return np.stack([np.stack(corner, axis=-1) for corner in corners], axis=1).tolist()
+
+
 def build_safety_layer_from_graph(G) -> RiskLayer:
     """
-    Build an aggregated "safety map" layer from node attributes:
+    Build an aggregated "safety map" layer from the node risk arrays (node_risks):
       - piracy_risk
       - weather_risk
       - depth_penalty
@@ -30,122 +42,65 @@ def build_safety_layer_from_graph(G) -> RiskLayer:
     Returns a RiskLayer(type="safety") with severity 1..5 for ALL sea cells
     (not only where risk > 0).
     """
-
-    # 1) Aggregate raw risk per grid cell (include zeros to cover all sea)
-    buckets: Dict[Tuple[float, float], List[float]] = {}
-
-    for _, data in G.nodes(data=True):
-        lat = data.get("lat")
-        lon = data.get("lon")
-        if lat is None or lon is None:
-            continue
-
-        piracy = float(data.get("piracy_risk", 0.0))
-        weather = float(data.get("weather_risk", 0.0))
-        depth = float(data.get("depth_penalty", 0.0))
-        traffic = float(data.get("traffic_risk", 0.0))
-        geo = float(data.get("geo_base_risk", 0.0))
-
-        # Weighted combination (tune as needed):
-        # - heavier weight on piracy/geopolitics
-        # - medium weight on traffic/depth
-        # - weather smoothed down
-        risk_raw = (
-            piracy * 3.0 +
-            geo * 3.0 +
-            traffic * 2.0 +
-            depth * 2.0 +
-            weather * 0.5
-        )
-
-        if not math.isfinite(risk_raw):
-            continue
-
-        cell = _cell_for_latlon(float(lat), float(lon))
-        buckets.setdefault(cell, []).append(risk_raw)
-
-    if not buckets:
+    _node_ids, coords = node_coords(G)
+    _node_index, risks = node_risks(G)
+    piracy, weather, depth, traffic, geo = (risks[attr] for attr in NODE_RISK_ATTRS)
+
+    # 1) Raw risk per node (include zeros to cover all sea). Weighted combination (tune as needed):
+    # - heavier weight on piracy/geopolitics
+    # - medium weight on traffic/depth
+    # - weather smoothed down
+    risk_raw = (
+        piracy * 3.0 +
+        geo * 3.0 +
+        traffic * 2.0 +
+        depth * 2.0 +
+        weather * 0.5
+    )
+    finite = np.isfinite(risk_raw)
+    if not finite.any():
         return RiskLayer(type="safety", name="Aggregated Safety Map", features=[])
-
-    # 2) Mean risk per cell + track global min/max for normalization
-    cell_scores: Dict[Tuple[float, float], float] = {}
-    max_score = -1e9
-    min_score = 1e9
-
-    for cell, vals in buckets.items():
-        avg = sum(vals) / len(vals)
-        cell_scores[cell] = avg
-        if avg > max_score:
-            max_score = avg
-        if avg < min_score:
-            min_score = avg
-
-    # 3) Build rectangular polygons for a heatmap effect
-    half_lat = GRID_LAT_STEP / 2.0
-    half_lon = GRID_LON_STEP / 2.0
-
-    features: List[RiskFeature] = []
-    idx = 0
-
+    risk_raw = risk_raw[finite]
+
+    # 2) Mean risk per grid cell (as _cell_for_latlon: np.rint rounds half to even like round()).
+    #    Cells keep first-seen node order; bincount sums each cell's values in node order.
+    cell_idx = np.column_stack([
+        np.rint(coords[finite, 0] / GRID_LAT_STEP),
+        np.rint(coords[finite, 1] / GRID_LON_STEP),
+    ]).astype(np.int64)
+    cells, first, inverse = np.unique(cell_idx, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    cell_scores = np.bincount(inverse, weights=risk_raw) / np.bincount(inverse)
+
+    order = np.argsort(first, kind="stable")
+    cells = cells[order]
+    cell_scores = cell_scores[order]
+    max_score = cell_scores.max()
+    min_score = cell_scores.min()
+
+    # 3) Severities: min..max → 1..5 (linear); uniform risk → mid severity (3) everywhere
     if max_score <= min_score:
-        # Edge case: uniform risk → assign mid severity (3) everywhere
-        for (cell_lat, cell_lon) in cell_scores.keys():
-            lat_min = cell_lat - half_lat
-            lat_max = cell_lat + half_lat
-            lon_min = cell_lon - half_lon
-            lon_max = cell_lon + half_lon
-
-            polygon = [
-                [lat_min, lon_min],
-                [lat_min, lon_max],
-                [lat_max, lon_max],
-                [lat_max, lon_min],
-                [lat_min, lon_min],
-            ]
-            features.append(
-                RiskFeature(
-                    id=f"safety_{idx}",
-                    polygon=polygon,
-                    riskLevel=None,
-                    severity=3,
-                )
-            )
-            idx += 1
+        severities = [3] * len(cells)
     else:
-        # Map min..max → severity 1..5 (linear)
-        span = max_score - min_score
-        for (cell_lat, cell_lon), score in cell_scores.items():
-            norm = (score - min_score) / span  # 0..1
-            sev = 1 + int(round(norm * 4.0))
-            if sev < 1:
-                sev = 1
-            if sev > 5:
-                sev = 5
-
-            lat_min = cell_lat - half_lat
-            lat_max = cell_lat + half_lat
-            lon_min = cell_lon - half_lon
-            lon_max = cell_lon + half_lon
-
-            polygon = [
-                [lat_min, lon_min],
-                [lat_min, lon_max],
-                [lat_max, lon_max],
-                [lat_max, lon_min],
-                [lat_min, lon_min],
-            ]
-            features.append(
-                RiskFeature(
-                    id=f"safety_{idx}",
-                    polygon=polygon,
-                    riskLevel=None,
-                    severity=sev,
-                )
-            )
-            idx += 1
-
-    return RiskLayer(
-    type="safety",
-    name="Aggregated Safety Map",
-    features=features,
-)
+        norm = (cell_scores - min_score) / (max_score - min_score)  # 0..1
+        severities = np.clip(1 + np.rint(norm * 4.0).astype(np.int64), 1, 5).tolist()
+
+    # 4) Rectangular polygons for a heatmap effect
+    polygons = _cell_rects(cells[:, 0] * GRID_LAT_STEP, cells[:, 1] * GRID_LON_STEP)
+    features: List[RiskFeature] = [
+        construct_trusted(
+            RiskFeature,
+            id=f"safety_{idx}",
+            polygon=polygon,
+            riskLevel=None,
+            severity=sev,
+        )
+        for idx, (polygon, sev) in enumerate(zip(polygons, severities))
+    ]
+
+    return construct_trusted(
+        RiskLayer,
+        type="safety",
+        name="Aggregated Safety Map",
+        features=features,
+    )
@@ -1,19 +1,19 @@
 # scripts/update_weather_for_graph.py
 import logging
-from backend.graph_builder import load_graph, save_graph
+from backend.graph_builder import load_graph, save_graph, graph_cache_exists
 from backend.live_weather import update_graph_weather
-from backend.config import GRAPH_PICKLE_PATH
+from backend.config import GRAPH_NPZ_PATH
 
 logging.basicConfig(level=logging.INFO)
 
 def main():
     """Refresh live weather data (wave + wind) in the saved maritime graph."""
-    if not GRAPH_PICKLE_PATH.exists():
-        print(f"[ERROR] Graph file not found: {GRAPH_PICKLE_PATH}")
-        print("Run the backend once to generate 'maritime_graph.pkl' first.")
+    if not graph_cache_exists():
+        print(f"[ERROR] Graph file not found: {GRAPH_NPZ_PATH}")
+        print("Run the backend once to generate 'maritime_graph.npz' first.")
         return
 
-    print(f"Loading graph from {GRAPH_PICKLE_PATH} ...")
+    print("Loading saved graph ...")
     try:
         G = load_graph()
     except Exception as e:
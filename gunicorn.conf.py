@@ -0,0 +1,17 @@
+# gunicorn.conf.py — production server: gunicorn running Uvicorn workers
+#   gunicorn backend.main:app
+# (gunicorn picks this file up from the working directory)
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Kept small on purpose: every worker loads its own graph and runs its own
+# startup AIS websocket and Open-Meteo burst, so upstream load (and 429s)
+# scale with this. Each worker already serves /route on ROUTE_WORKERS threads.
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+# Workers only start heartbeating once startup is done, and startup includes
+# the 60 s AIS snapshot: leave room for it before the arbiter kills a worker
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 180))
+graceful_timeout = 30
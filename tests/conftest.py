@@ -0,0 +1,73 @@
+import networkx as nx
+import pytest
+
+from backend import graph_builder
+from backend.graph_builder import attach_node_coords, haversine_nm
+from backend.models import Port
+
+# Tiny regular grid (same id scheme and attributes as build_graph_and_layers)
+LAT0, LON0, STEP = 10.0, 20.0, 0.5
+N_ROWS, N_COLS = 4, 6
+LAND = {(1, 2), (2, 2)}  # a short wall the routes must go around
+PIRATE_ROW = 0  # risky bottom row: safe mode should avoid it
+ISLAND = N_ROWS * N_COLS  # water node with no edges
+
+
+def make_grid() -> nx.Graph:
+    G = nx.Graph()
+    for row in range(N_ROWS):
+        for col in range(N_COLS):
+            if (row, col) in LAND:
+                continue
+            G.add_node(
+                row * N_COLS + col,
+                lat=LAT0 + row * STEP,
+                lon=LON0 + col * STEP,
+                piracy_risk=3.0 if row == PIRATE_ROW else 0.0,
+                weather_risk=float(col % 2),
+                depth_penalty=0.0,
+                geo_base_risk=0.0,
+                geo_target_flags={},
+            )
+    G.add_node(ISLAND, lat=LAT0 - 5.0, lon=LON0 - 5.0, piracy_risk=0.0, weather_risk=0.0,
+               depth_penalty=0.0, geo_base_risk=0.0, geo_target_flags={})
+
+    for node_id, data in list(G.nodes(data=True)):
+        if node_id == ISLAND:
+            continue
+        row, col = divmod(node_id, N_COLS)
+        for neighbor in (node_id + N_COLS if row + 1 < N_ROWS else None, node_id + 1 if col + 1 < N_COLS else None):
+            if neighbor in G:
+                other = G.nodes[neighbor]
+                dist = float(haversine_nm(data["lat"], data["lon"], other["lat"], other["lon"]))
+                G.add_edge(node_id, neighbor, distance_nm=dist)
+
+    attach_node_coords(G)
+    return G
+
+
+@pytest.fixture
+def grid() -> nx.Graph:
+    return make_grid()
+
+
+@pytest.fixture
+def ports():
+    def port(port_id, row, col):
+        return Port(id=port_id, name=port_id, country="Nowhere", latitude=LAT0 + row * STEP, longitude=LON0 + col * STEP)
+
+    return {
+        "WEST": port("WEST", 1, 0),
+        "EAST": port("EAST", 1, N_COLS - 1),
+        "NORTH": port("NORTH", N_ROWS - 1, 3),
+        "SOUTH": port("SOUTH", 0, 1),
+    }
+
+
+@pytest.fixture
+def graph_paths(tmp_path, monkeypatch):
+    """Point save_graph / load_graph at a temporary directory."""
+    monkeypatch.setattr(graph_builder, "GRAPH_NPZ_PATH", tmp_path / "graph.npz")
+    monkeypatch.setattr(graph_builder, "GRAPH_PICKLE_PATH", tmp_path / "graph.pkl")
+    monkeypatch.setattr(graph_builder, "GRAPH_ARRAYS_DIR", tmp_path / "graph_arrays")
+    return tmp_path
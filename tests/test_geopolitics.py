@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+from backend import geopolitics, main
+from backend.geopolitics import (
+    apply_geopolitics_to_graph,
+    invalidate_geopolitics_config,
+    load_geopolitics_config,
+)
+from conftest import LAT0, LON0
+
+
+def zone(zone_id, base_risk, lat_max=LAT0 + 0.75):
+    """Rectangle over the grid's two bottom rows, as a GeoJSON feature."""
+    ring = [[LON0 - 1, LAT0 - 1], [LON0 + 4, LAT0 - 1], [LON0 + 4, lat_max], [LON0 - 1, lat_max], [LON0 - 1, LAT0 - 1]]
+    return {
+        "type": "Feature",
+        "properties": {"zone_id": zone_id, "name": f"Zone {zone_id}", "base_risk": base_risk, "notes": "watch out"},
+        "geometry": {"type": "Polygon", "coordinates": [ring]},
+    }
+
+
+def write_config(path, features, bump_mtime=False):
+    path.write_text(json.dumps({"type": "FeatureCollection", "properties": {}, "features": features}))
+    if bump_mtime:
+        # Coarse filesystem clocks: make sure the edit is visible as a new mtime
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def geo_path(tmp_path, monkeypatch):
+    path = tmp_path / "geopolitics.geojson"
+    monkeypatch.setattr(geopolitics, "GEOPOLITICS_GEOJSON_PATH", path)
+    load_geopolitics_config.cache_clear()
+    geopolitics._zone_metadata.cache_clear()
+    yield path
+    load_geopolitics_config.cache_clear()
+    geopolitics._zone_metadata.cache_clear()
+
+
+def test_invalidate_only_after_the_file_changes(geo_path):
+    write_config(geo_path, [zone("A", 1.0)])
+    assert [f.id for f in load_geopolitics_config().layer.features] == ["A"]
+    assert not invalidate_geopolitics_config()
+
+    write_config(geo_path, [zone("B", 2.0)], bump_mtime=True)
+    assert invalidate_geopolitics_config()
+    assert [f.id for f in load_geopolitics_config().layer.features] == ["B"]
+
+
+def test_reload_geopolitics_reapplies_to_graph(grid, geo_path, monkeypatch):
+    write_config(geo_path, [zone("A", 1.0)])
+    monkeypatch.setattr(main, "GRAPH", grid)
+    monkeypatch.setattr(main, "GEOPOL_LAYER", load_geopolitics_config().layer)
+    monkeypatch.setattr(main, "SAFETY_LAYER", None)
+    apply_geopolitics_to_graph(grid)
+    version = grid.graph["risk_version"]
+    assert grid.nodes[0]["geo_base_risk"] == 1.0
+
+    assert not main.reload_geopolitics()
+
+    write_config(geo_path, [zone("A", 3.0)], bump_mtime=True)
+    assert main.reload_geopolitics()
+    assert grid.nodes[0]["geo_base_risk"] == 3.0
+    assert grid.graph["risk_version"] > version
+    assert main.GEOPOL_LAYER.features[0].riskLevel == 3
+    assert main.SAFETY_LAYER is not None
+
+
+def test_zone_metadata_only_for_zones_with_an_id(geo_path):
+    unnamed = zone(None, 1.0)
+    del unnamed["properties"]["zone_id"]
+    no_geometry = {"type": "Feature", "properties": {"id": "C", "notes": "no shape"}, "geometry": None}
+    write_config(geo_path, [zone("B", 1.0), unnamed, zone("A", 2.0), no_geometry])
+
+    meta = geopolitics.get_zone_metadata()
+
+    assert list(meta) == ["A", "B", "C"]
+    assert meta["A"] == {"name": "Zone A", "notes": "watch out"}
+    assert meta["C"] == {"name": "C", "notes": "no shape"}
+    assert "geo_zone" not in meta
+
+
+def test_route_alerts_skip_zones_without_an_id(grid, ports, geo_path):
+    from backend.models import RouteRequest
+    from backend.routing import compute_route
+
+    unnamed = zone(None, 1.0)
+    del unnamed["properties"]["zone_id"]
+    write_config(geo_path, [unnamed])
+    apply_geopolitics_to_graph(grid)
+
+    request = RouteRequest(
+        origin={"type": "port", "portId": "SOUTH"},
+        destination={"type": "port", "portId": "WEST"},
+        mode="fast",
+    )
+    response = compute_route(grid, request, ports)
+
+    assert not [t for t in response.explanation.tradeoffs if t.startswith("Route Alert")]
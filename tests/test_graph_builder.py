@@ -0,0 +1,37 @@
+import numpy as np
+
+from backend.graph_builder import edge_arrays, load_graph, node_coords, save_graph
+
+
+def test_save_load_round_trip(grid, graph_paths):
+    grid.nodes[7]["geo_target_flags"] = {"USA": 2.0}
+    grid.nodes[7]["geo_zones"] = ["zone_a"]
+
+    save_graph(grid)
+    G = load_graph()
+
+    assert list(G.nodes(data=True)) == list(grid.nodes(data=True))
+    assert list(G.edges(data=True)) == list(grid.edges(data=True))
+    # Same neighbor order per node, so searches break ties the same way
+    assert all(list(G.adj[n]) == list(grid.adj[n]) for n in grid)
+
+
+def test_load_maps_saved_arrays(grid, graph_paths):
+    save_graph(grid)
+    G = load_graph()
+
+    node_order, coords = node_coords(G)
+    assert isinstance(coords, np.memmap)
+    assert node_order == list(grid.nodes)
+    np.testing.assert_array_equal(coords, node_coords(grid)[1])
+    for loaded, built in zip(edge_arrays(G), edge_arrays(grid)):
+        np.testing.assert_array_equal(loaded, built)
+
+
+def test_save_leaves_no_temporary_files(grid, graph_paths):
+    save_graph(grid)
+    save_graph(grid)  # overwriting an existing snapshot
+
+    assert not list(graph_paths.rglob("*.tmp"))
+    assert (graph_paths / "graph.npz").exists()
+    assert len(list((graph_paths / "graph_arrays").glob("*.npy"))) == 5
@@ -0,0 +1,29 @@
+import requests
+
+from backend.live_weather import WEATHER_BACKOFF_SEC, WEATHER_RETRY_AFTER_MAX_FACTOR, _retry_delay
+
+
+def rate_limited(retry_after=None) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 429
+    if retry_after is not None:
+        resp.headers["Retry-After"] = retry_after
+    return resp
+
+
+def test_retry_delay_backs_off_exponentially_without_header():
+    assert _retry_delay(rate_limited(), 0) == WEATHER_BACKOFF_SEC
+    assert _retry_delay(rate_limited(), 2) == WEATHER_BACKOFF_SEC * 4
+    assert _retry_delay(rate_limited("soon"), 1) == WEATHER_BACKOFF_SEC * 2
+
+
+def test_retry_delay_honours_short_retry_after():
+    assert _retry_delay(rate_limited("2"), 0) == 2.0
+    assert _retry_delay(rate_limited("-5"), 0) == 0.0
+
+
+def test_retry_delay_gives_up_on_long_retry_after():
+    limit = WEATHER_BACKOFF_SEC * WEATHER_RETRY_AFTER_MAX_FACTOR
+    assert _retry_delay(rate_limited(str(limit)), 0) == limit
+    assert _retry_delay(rate_limited(str(limit + 1)), 0) is None
+    assert _retry_delay(rate_limited("3600"), 3) is None
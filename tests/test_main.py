@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from backend import main
+
+
+def test_parse_bbox():
+    assert main.parse_bbox("-10,20,30,40") == (-10.0, 20.0, 30.0, 40.0)
+
+
+@pytest.mark.parametrize(
+    "bbox",
+    ["1,2,3", "3,0,1,1", "nan,0,1,1", "nan,nan,nan,nan", "-inf,0,inf,1", "0,0,1e999,1"],
+)
+def test_parse_bbox_rejects_invalid(bbox):
+    with pytest.raises(ValueError):
+        main.parse_bbox(bbox)
+
+
+def test_risk_layers_rejects_non_finite_bbox():
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.risk_layers(types=None, bbox="nan,nan,nan,nan", accept=None))
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail["error"] == "INVALID_BBOX"
@@ -0,0 +1,77 @@
+from backend.graph_builder import load_graph, save_graph
+from backend.models import RouteRequest
+from backend.routing import compute_route
+
+
+def port_request(origin, destination, mode="balanced"):
+    return RouteRequest(
+        origin={"type": "port", "portId": origin},
+        destination={"type": "port", "portId": destination},
+        mode=mode,
+    )
+
+
+def test_compute_route_on_freshly_loaded_graph(grid, ports, graph_paths):
+    save_graph(grid)
+    G = load_graph()
+    assert "risk_version" not in G.graph
+
+    response = compute_route(G, port_request("WEST", "EAST"), ports)
+
+    assert response.status == "ok"
+    assert response.summary.totalDistanceNm > 0
+    assert response.path.coordinates[0] == [ports["WEST"].latitude, ports["WEST"].longitude]
+    assert response.path.coordinates[-1] == [ports["EAST"].latitude, ports["EAST"].longitude]
+
+
+def test_route_weights_cache_is_thread_safe(grid):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.routing import _ROUTE_WEIGHTS_CACHE_SIZE, _route_weights
+
+    # More (mode, flag) keys than the cache holds, so threads keep evicting
+    keys = [(mode, f"X{i:02d}") for mode in ("safe", "fast", "balanced") for i in range(10)]
+    assert len(keys) > _ROUTE_WEIGHTS_CACHE_SIZE
+
+    def churn(offset):
+        for i in range(200):
+            mode, iso3 = keys[(offset + i) % len(keys)]
+            assert _route_weights(grid, mode, iso3) is not None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(churn, range(8)))
+
+    assert len(grid.graph["route_weights"][2]) <= _ROUTE_WEIGHTS_CACHE_SIZE
+
+
+def test_compute_routes_matches_compute_route(ports, graph_paths):
+    from conftest import make_grid
+
+    from backend.routing import compute_routes, port_node_map
+
+    near_east = {"type": "coordinates", "latitude": ports["EAST"].latitude + 0.1, "longitude": ports["EAST"].longitude - 0.1}
+    at_west = {"type": "coordinates", "latitude": ports["WEST"].latitude, "longitude": ports["WEST"].longitude}
+    requests = [
+        # Shared origin and mode: one search serves all three
+        port_request("WEST", "EAST", "safe"),
+        port_request("WEST", "NORTH", "safe"),
+        port_request("WEST", "SOUTH", "safe"),
+        port_request("WEST", "EAST", "fast"),
+        RouteRequest(origin=near_east, destination={"type": "port", "portId": "SOUTH"}, mode="balanced"),
+        # Same node, once by port and once by a coordinate that snaps to it
+        port_request("NORTH", "NORTH", "safe"),
+        RouteRequest(origin={"type": "port", "portId": "WEST"}, destination=at_west, mode="safe"),
+    ]
+
+    # Separate graphs, so neither side is served from the other's caches
+    save_graph(make_grid())
+    batch = compute_routes(load_graph(), requests, ports)
+    single_graph = make_grid()
+    single = [compute_route(single_graph, request, ports) for request in requests]
+
+    assert [r.model_dump_json() for r in batch] == [r.model_dump_json() for r in single]
+    mapped_graph = make_grid()
+    mapped = compute_routes(mapped_graph, requests, ports, port_nodes=port_node_map(mapped_graph, ports))
+    assert [r.model_dump_json() for r in mapped] == [r.model_dump_json() for r in single]
+    assert batch[5].summary.totalDistanceNm == 0.0
+    assert batch[6].path.coordinates == [[ports["WEST"].latitude, ports["WEST"].longitude]]
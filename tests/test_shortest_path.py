@@ -0,0 +1,111 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from backend import routing
+from backend.graph_builder import attach_node_risks, edge_arrays, load_graph, node_coords, save_graph
+from backend.routing import (
+    _csr_layout,
+    build_weight_function,
+    edge_costs,
+    shortest_path_nodes,
+)
+from conftest import ISLAND, N_COLS, PIRATE_ROW, make_grid
+
+MODES = ("safe", "fast", "balanced")
+WEST, EAST = 1 * N_COLS, 2 * N_COLS - 1  # ends of the row above the pirate row
+
+
+@pytest.fixture(params=["scipy", "networkx"])
+def engine(request, monkeypatch):
+    """Run a test with scipy's Dijkstra and again with the networkx fallback."""
+    if request.param == "networkx":
+        monkeypatch.setattr(routing, "dijkstra", None)
+    return request.param
+
+
+def path_cost(G, path, mode):
+    weight = build_weight_function(mode, G, None)
+    return sum(weight(u, v, G[u][v]) for u, v in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_edge_costs_match_weight_function(grid, mode):
+    node_order, _coords = node_coords(grid)
+    weight = build_weight_function(mode, grid, None)
+    expected = [weight(u, v, attrs) for u, v, attrs in grid.edges(data=True)]
+    edge_u, edge_v, _dist = edge_arrays(grid)
+
+    assert edge_costs(mode, grid, None).tolist() == expected
+    assert [(node_order[u], node_order[v]) for u, v in zip(edge_u.tolist(), edge_v.tolist())] == list(grid.edges)
+
+
+def test_csr_layout_is_the_symmetric_adjacency(grid):
+    indptr, indices, edge_of = _csr_layout(grid)
+    node_order, _coords = node_coords(grid)
+    edge_u, edge_v, _dist = edge_arrays(grid)
+
+    for i, node_id in enumerate(node_order):
+        row = indices[indptr[i]:indptr[i + 1]]
+        assert sorted(node_order[j] for j in row.tolist()) == sorted(grid.adj[node_id])
+        for j, e in zip(row.tolist(), edge_of[indptr[i]:indptr[i + 1]].tolist()):
+            assert {edge_u[e], edge_v[e]} == {i, j}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_engines_find_equally_cheap_paths(grid, mode, monkeypatch):
+    scipy_path = shortest_path_nodes(grid, WEST, EAST, mode, None)
+    monkeypatch.setattr(routing, "dijkstra", None)
+    # Fresh graph: the cached weights are engine specific (CSR matrix vs callback)
+    nx_path = shortest_path_nodes(make_grid(), WEST, EAST, mode, None)
+
+    assert scipy_path[0] == nx_path[0] == WEST
+    assert scipy_path[-1] == nx_path[-1] == EAST
+    assert path_cost(grid, scipy_path, mode) == pytest.approx(path_cost(grid, nx_path, mode))
+    reference = nx.dijkstra_path_length(grid, WEST, EAST, weight=build_weight_function(mode, grid, None))
+    assert path_cost(grid, scipy_path, mode) == pytest.approx(reference)
+
+
+def test_safe_mode_avoids_the_pirate_row(grid, engine):
+    west, east = PIRATE_ROW * N_COLS, PIRATE_ROW * N_COLS + N_COLS - 1
+    safe = shortest_path_nodes(grid, west, east, "safe", None)
+    fast = shortest_path_nodes(grid, west, east, "fast", None)
+
+    assert all(divmod(n, N_COLS)[0] == PIRATE_ROW for n in fast)
+    assert any(divmod(n, N_COLS)[0] != PIRATE_ROW for n in safe)
+
+
+def test_same_origin_and_destination_skips_the_search(grid, engine, monkeypatch):
+    def no_search(*args, **kwargs):
+        raise AssertionError("no search expected for a zero-length route")
+
+    monkeypatch.setattr(routing, "_route_weights", no_search)
+    assert shortest_path_nodes(grid, WEST, WEST, "safe", None) == [WEST]
+
+
+def test_unreachable_destination_raises(grid, engine):
+    with pytest.raises(nx.NetworkXNoPath):
+        shortest_path_nodes(grid, WEST, ISLAND, "balanced", None)
+
+
+def test_cached_paths_follow_risk_refreshes(grid):
+    route = lambda: routing._cached_path_nodes(grid, WEST, EAST, "safe", None, grid.graph["risk_version"])
+    attach_node_risks(grid)
+    before = route()
+
+    # Make the current path's interior very risky: the next lookup must re-route
+    for node_id in before[1:-1]:
+        grid.nodes[node_id]["piracy_risk"] = 100.0
+    attach_node_risks(grid)
+
+    after = route()
+    assert after != before
+
+
+def test_routes_survive_save_and_load(grid, graph_paths, engine):
+    save_graph(grid)
+    loaded = load_graph()
+
+    for mode in MODES:
+        assert shortest_path_nodes(loaded, WEST, EAST, mode, None) == shortest_path_nodes(grid, WEST, EAST, mode, None)
+    np.testing.assert_array_equal(edge_costs("safe", loaded, None), edge_costs("safe", grid, None))